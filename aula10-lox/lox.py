@@ -2,7 +2,11 @@ from typing import Callable, Union
 from dataclasses import dataclass
 from pathlib import Path
 import operator
-from lark import Lark, Transformer, v_args # type: ignore
+import sys
+from lark import Transformer, v_args # type: ignore
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parser_factory import make_parser
 
 # Caminho até o arquivo grammar.lark que define a gramática Lark
 DIR = Path(__file__).parent
@@ -39,10 +43,16 @@ class LoxTransformer(Transformer):
     def NUMBER(self, token):
         return Literal(float(token))  # Transforma número em objeto literal
 
+    def NIL(self, token):
+        return Literal(None)
+
+    def BOOL(self, token):
+        return Literal(token == "true")
+
 
 # Parser e transformer instanciados
 transformer = LoxTransformer()
-parser = Lark(grammar)
+parser = make_parser(grammar)
 
 # Definições de tipos para facilitar a leitura e o uso posterior
 Expr = Union["BinOp", "Literal", "Var"]
@@ -128,3 +138,6 @@ if __name__ == "__main__":
     # Avalia a expressão com variáveis dadas
     result = lox_tree.eval({"x": 20, "y": 2, "z": 3})
     pprint(result)  # Esperado: True
+
+    # nil é um literal, não uma variável
+    assert transformer.transform(parser.parse("x == nil")).eval({"x": None}) is True
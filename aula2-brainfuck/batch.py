@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+"""
+Execução em lote de muitos pares (programa, entrada) Brainfuck.
+
+Os trabalhos são distribuídos por um ProcessPoolExecutor com um processo por
+núcleo disponível. Cada trabalho roda com entrada e saída em memória e com
+limites opcionais de passos e de tempo; os resultados são emitidos em JSON
+Lines, um por linha, na ordem em que terminam.
+
+Os trabalhos podem vir de:
+
+* um diretório: cada arquivo X.bf é um programa e, se existir, X.in é a
+  entrada dele;
+* um manifesto JSON Lines, com um objeto por linha:
+
+      {"id": "soma", "program": "exemplo.bf", "input": "34"}
+      {"program": "exemplo.bf", "input_file": "entrada.txt"}
+
+  Caminhos relativos são resolvidos a partir do diretório do manifesto.
+
+    python3 batch.py programas/ --workers 8 --max-steps 1000000 > resultados.jsonl
+"""
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import click  # type: ignore
+
+from bf import BF, StepLimitError
+from bfio import MemoryIO
+
+
+@dataclass
+class Job:
+    id: str
+    program: str      # Caminho do arquivo .bf
+    input: bytes = b""
+
+
+# Lê os trabalhos de um diretório ou de um manifesto JSON Lines
+def load_jobs(path: str | Path) -> Iterator[Job]:
+    path = Path(path)
+    if path.is_dir():
+        for program in sorted(path.glob("*.bf")):
+            data_path = program.with_suffix(".in")
+            data = data_path.read_bytes() if data_path.exists() else b""
+            yield Job(program.stem, str(program), data)
+        return
+
+    base = path.parent
+    with open(path) as fd:
+        for lineno, line in enumerate(fd, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            program = base / entry["program"]
+            if "input_file" in entry:
+                data = (base / entry["input_file"]).read_bytes()
+            else:
+                data = entry.get("input", "").encode("utf8")
+            yield Job(str(entry.get("id", lineno)), str(program), data)
+
+
+# Executa um trabalho; roda dentro de um processo do pool
+def run_job(job: Job, max_steps: int | None, timeout: float | None, backend: str) -> dict:
+    io = MemoryIO(job.input)
+    vm = BF(io=io, max_steps=max_steps, timeout=timeout)
+    result = {"id": job.id, "program": job.program, "status": "ok", "error": None}
+
+    t0 = time.perf_counter()
+    try:
+        with open(job.program) as fd:
+            src = fd.read()
+        if backend == "python":
+            vm.run_python(src)
+        else:
+            vm.run(src)
+    except StepLimitError as exc:
+        result.update(status="step-limit", error=str(exc))
+    except TimeoutError as exc:
+        result.update(status="timeout", error=str(exc))
+    except Exception as exc:
+        result.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    result["time"] = time.perf_counter() - t0
+
+    # A saída é texto na maioria dos casos; bytes inválidos viram escapes \xNN
+    result["output"] = io.getvalue().decode("utf8", "backslashreplace")
+    return result
+
+
+# Núcleos que este processo pode usar
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def run_batch(
+    jobs: Iterator[Job],
+    *,
+    workers: int | None = None,
+    max_steps: int | None = None,
+    timeout: float | None = None,
+    backend: str = "interp",
+) -> Iterator[dict]:
+    """
+    Distribui os trabalhos pelo pool de processos e produz cada resultado
+    assim que ele fica pronto (não necessariamente na ordem de entrada). No
+    máximo dois trabalhos por processo ficam submetidos ao mesmo tempo, para
+    que os trabalhos (e seus resultados) não se acumulem na memória.
+    """
+    workers = workers or available_cpus()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: set = set()
+        for job in jobs:
+            pending.add(pool.submit(run_job, job, max_steps, timeout, backend))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
+
+
+@click.command()
+@click.argument("source", type=click.Path(exists=True))
+@click.option("--workers", type=int, default=None, help="Processos no pool (padrão: núcleos disponíveis).")
+@click.option("--max-steps", type=int, default=None, help="Máximo de iterações de loop por trabalho.")
+@click.option("--timeout", type=float, default=None, help="Tempo máximo por trabalho, em segundos.")
+@click.option("--backend", type=click.Choice(["interp", "python"]), default="interp",
+              help="Interpretador de instruções ou tradução para Python.")
+def main(source, workers, max_steps, timeout, backend):
+    jobs = load_jobs(source)
+    for result in run_batch(jobs, workers=workers, max_steps=max_steps, timeout=timeout, backend=backend):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
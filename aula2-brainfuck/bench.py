@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+"""
+Benchmark dos backends de execução de Brainfuck.
+
+Roda um corpus de programas pesados em cada backend (interpretador com e sem
+otimizações, tradução para Python e executável C gerado pelo bfc.py), com
+aquecimento e várias repetições medidas com perf_counter. Para cada par
+(programa, backend) reporta o melhor tempo, a mediana, instruções Brainfuck
+executadas por segundo e o pico de memória (só nos backends Python), e pode gravar tudo em JSON para
+acompanhar regressões ao longo do tempo.
+
+    python3 bench.py --repeat 5 --json resultados.json
+"""
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import click  # type: ignore
+
+import bfc
+from bf import BF
+from bfio import MemoryIO
+from bfir import compile_bf
+
+DIR = Path(__file__).parent
+NO_OPTS = dict(fold=False, clear=False, scan=False, mul=False)
+
+
+# Corpus: nome -> (código-fonte, entrada)
+def corpus() -> dict[str, tuple[str, bytes]]:
+    programs = {
+        "exemplo": ((DIR / "exemplo.bf").read_text(), b"34"),
+        "exemplo2": ("+" * 200 + ">" + "+" * 50 + "<" + (DIR / "exemplo2.bf").read_text(), b""),
+        # Quatro loops aninhados; o mais interno contém outro loop e por isso
+        # não pode ser reduzido a uma multiplicação
+        "nested_loops": ("{n}[>{n}[>{n}[>{n}[>+[-]<-]<-]<-]<-]".format(n="+" * 30), b""),
+        # Escreve 100 mil caracteres
+        "long_output": (
+            "++++++++[>++++++++<-]>+>" + "+" * 100 + "[>++++++++++[>++++++++++[>++++++++++[<<<<.>>>>-]<-]<-]<-]",
+            b"",
+        ),
+        # Vai e volta 200 vezes sobre uma fita com 1000 células preenchidas
+        "tape_walk": ("+" * 200 + ">>" + "+>" * 1000 + "<" * 1001 + "<" + "[>>[>]<[<]<-]", b""),
+    }
+    return programs
+
+
+# Backends: nome -> função que recebe (fonte, entrada) e executa o programa
+def python_backends() -> dict[str, Callable[[str, bytes], None]]:
+    return {
+        "interp-noopt": lambda src, data: BF(io=MemoryIO(data)).run(src, **NO_OPTS),
+        "interp": lambda src, data: BF(io=MemoryIO(data)).run(src),
+        "python": lambda src, data: BF(io=MemoryIO(data)).run_python(src),
+    }
+
+
+# Conta quantos comandos Brainfuck (sem otimização) o programa executa. É a
+# base para calcular instruções por segundo de forma comparável entre backends.
+def count_steps(src: str, data: bytes) -> int:
+    code = compile_bf(src, **NO_OPTS)
+    memory = bytearray(30_000)
+    index = pc = steps = pos = 0
+    while pc < len(code):
+        op, arg = code[pc]
+        steps += 1
+        if op == "add":
+            memory[index] = (memory[index] + arg) & 255
+        elif op == "move":
+            index += arg
+        elif op == "in":
+            memory[index] = data[pos] if pos < len(data) else 0
+            pos += 1
+        elif op == "open" and memory[index] == 0:
+            pc = arg
+        elif op == "close" and memory[index] != 0:
+            pc = arg
+        pc += 1
+    return steps
+
+
+# Mede uma função Python: retorna (tempos, pico de memória em bytes)
+def time_python(fn: Callable[[], None], warmup: int, repeat: int) -> tuple[list[float], int]:
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    # O pico de memória é medido numa execução separada, pois o tracemalloc
+    # deixa a execução bem mais lenta
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak
+
+
+# Mede o executável gerado pelo bfc.py: retorna (tempos, None). O tempo
+# inclui a criação do processo. O pico de memória não é medido: no Linux o
+# ru_maxrss de um processo criado a partir do Python herda o valor do
+# interpretador (inclusive através de exec), então não diria nada sobre o
+# executável.
+def time_native(exe: Path, data: bytes, warmup: int, repeat: int) -> tuple[list[float], None]:
+    def run_once():
+        result = subprocess.run([exe], input=data, stdout=subprocess.DEVNULL)
+        if result.returncode != 0:
+            raise RuntimeError(f"{exe} terminou com código {result.returncode}")
+
+    for _ in range(warmup):
+        run_once()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run_once()
+        times.append(time.perf_counter() - t0)
+    return times, None
+
+
+@click.command()
+@click.option("--repeat", default=5, help="Execuções medidas por programa e backend.")
+@click.option("--warmup", default=1, help="Execuções de aquecimento, descartadas.")
+@click.option("--backend", "backends", multiple=True, help="Roda só estes backends (pode repetir).")
+@click.option("--program", "programs", multiple=True, help="Roda só estes programas (pode repetir).")
+@click.option("--native/--no-native", default=True, help="Inclui o executável C gerado pelo bfc.py.")
+@click.option("-O", "opt_level", default="2", help="Nível de otimização do compilador C.")
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Grava os resultados neste arquivo.")
+def main(repeat, warmup, backends, programs, native, opt_level, json_path):
+    results = []
+    selected = {k: v for k, v in corpus().items() if not programs or k in programs}
+
+    print(f"{'programa':<14} {'backend':<14} {'melhor (s)':>11} {'mediana (s)':>12} {'instr/s':>12} {'pico (KiB)':>11}")
+    for name, (src, data) in selected.items():
+        steps = count_steps(src, data)
+        runs = {}
+        for backend, fn in python_backends().items():
+            runs[backend] = lambda fn=fn: time_python(lambda: fn(src, data), warmup, repeat)
+        if native:
+            exe = bfc.build(bfc.BF(dynamic=True).to_c(src), opt_level=opt_level)
+            runs["native"] = lambda exe=exe: time_native(exe, data, warmup, repeat)
+
+        for backend, measure in runs.items():
+            if backends and backend not in backends:
+                continue
+            times, peak = measure()
+            best = min(times)
+            result = {
+                "program": name,
+                "backend": backend,
+                "steps": steps,
+                "times": times,
+                "best": best,
+                "median": statistics.median(times),
+                "steps_per_second": steps / best if best else None,
+                "peak_memory": peak,
+            }
+            results.append(result)
+            print(
+                f"{name:<14} {backend:<14} {best:>11.4f} {result['median']:>12.4f} "
+                f"{result['steps_per_second']:>12.3g} {'-' if peak is None else f'{peak / 1024:.1f}':>11}"
+            )
+
+    if json_path:
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "warmup": warmup,
+            "results": results,
+        }
+        Path(json_path).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
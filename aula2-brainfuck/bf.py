@@ -1,83 +1,373 @@
 #!/usr/bin/python3
+import hashlib
+import marshal
 import sys
-import click  # type: ignore # Biblioteca usada para ler entrada do usuário via teclado
+import time
+from pathlib import Path
+from types import CodeType
+import click  # type: ignore # Biblioteca usada para a linha de comando
+from bfir import compile_bf, Instr
+from tape import Tape
+from bfio import StreamIO, ClickIO, EOF_POLICIES
+
+
+# Traduz a IR para o código-fonte de uma função Python. Loops viram "while" e
+# cada instrução agrupada vira um único comando. A função recebe a fita, a
+# posição inicial do ponteiro, a máscara de overflow das células, as funções
+# de entrada e saída e as auxiliares da fita (veja BF.run_python), e retorna
+# a posição final do ponteiro.
+#
+# Com limited=True, cada iteração de loop decrementa um contador e chama
+# tick() quando ele zera, para que limites de passos e de tempo sejam
+# respeitados (veja BF.tick).
+def to_python(code: list[Instr], limited: bool = False) -> str:
+    lines = [
+        "def bf_main(m, p, k, write, read, check_index, find_zero, t, tick):",
+        "    n = len(m)",
+    ]
+    indent = "    "
+
+    def emit(line):
+        lines.append(indent + line)
+
+    # Ao sair da região atual da fita o ponteiro é verificado: à esquerda é
+    # erro (índices negativos seriam válidos em Python!), à direita a fita cresce
+    def emit_check(n):
+        if n < 0:
+            emit("if p < 0: raise IndexError")
+        else:
+            emit("if p >= n: n = check_index(p)")
+
+    for op, arg in code:
+        match op:
+            case "add":
+                emit(f"m[p] = (m[p] + {arg}) & k")
+            case "move":
+                emit(f"p += {arg}")
+                emit_check(arg)
+            case "out":
+                emit("write(m[p])")
+            case "in":
+                emit("v = read()")
+                emit("if v is not None: m[p] = v & k")
+            case "open":
+                emit("while m[p]:")
+                indent += "    "
+            case "close":
+                emit("pass")  # Garante corpo não vazio, ex.: "[]"
+                if limited:
+                    emit("t -= 1")
+                    emit("if t == 0: t = tick()")
+                indent = indent[:-4]
+            case "clear":
+                emit("m[p] = 0")
+            case "scan" if arg == 1:
+                emit("p = find_zero(p)")
+                emit("n = len(m)")
+            case "scan":
+                emit("while m[p]:")
+                indent += "    "
+                emit(f"p += {arg}")
+                emit_check(arg)
+                indent = indent[:-4]
+            case "mul":
+                emit("if m[p]:")
+                indent += "    "
+                emit("v = m[p]")
+                lo, hi = arg[0][0], arg[-1][0]
+                if lo < 0:
+                    emit(f"if p + {lo} < 0: raise IndexError")
+                if hi > 0:
+                    emit(f"if p + {hi} >= n: n = check_index(p + {hi})")
+                for offset, factor in arg:
+                    emit(f"m[p + {offset}] = (m[p + {offset}] + v * {factor}) & k")
+                emit("m[p] = 0")
+                indent = indent[:-4]
+
+    emit("return p")
+    return "\n".join(lines) + "\n"
+
+
+# Cache em memória dos objetos de código já traduzidos, indexado pelo hash
+# do código-fonte e das opções de otimização
+_code_cache: dict[str, CodeType] = {}
+
+
+# Retorna o objeto de código correspondente ao programa, traduzindo e
+# compilando apenas se ele não estiver no cache em memória nem no cache em
+# disco (opcional, em cache_dir).
+def load_python(src: str, cache_dir: str | Path | None = None, limited: bool = False, **options) -> CodeType:
+    key_src = f"{sys.implementation.cache_tag}\0{limited}\0{sorted(options.items())}\0{src}"
+    key = hashlib.sha256(key_src.encode()).hexdigest()
+    if key in _code_cache:
+        return _code_cache[key]
+
+    path = Path(cache_dir) / f"{key}.bfc" if cache_dir is not None else None
+    if path is not None and path.exists():
+        code_obj = marshal.loads(path.read_bytes())
+    else:
+        py_src = to_python(compile_bf(src, **options), limited)
+        code_obj = compile(py_src, f"<bf {key[:12]}>", "exec")
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(marshal.dumps(code_obj))
+
+    _code_cache[key] = code_obj
+    return code_obj
+
+
+class StepLimitError(RuntimeError):
+    """O programa excedeu o limite de passos (iterações de loop)."""
+
 
 # Classe que representa a máquina virtual do interpretador Brainfuck
 class BF:
-    def __init__(self):
-        self.memory = [0] * 10_000  # Fita de memória com 10.000 posições, todas iniciadas com 0
-        self.index = 0              # Ponteiro de memória (inicialmente na posição 0)
-
-    # Método que executa o código Brainfuck
-    def run(self, src: str):
-        chars = iter(src)  # Cria um iterador sobre os caracteres do código
-        for c in chars:
-            match c:
-                case ">":
-                    # Move o ponteiro uma posição para a direita
-                    self.index += 1
-
-                case "<":
-                    # Move o ponteiro uma posição para a esquerda
-                    if self.index == 0:
-                        raise IndexError  # Evita acessar posição negativa da memória
-                    self.index -= 1
-
-                case "+":
-                    # Incrementa o valor da célula atual, com overflow para 0 após 255
-                    self.memory[self.index] = (self.memory[self.index] + 1) % 256
-
-                case "-":
-                    # Decrementa o valor da célula atual, com underflow para 255 após 0
-                    self.memory[self.index] = (self.memory[self.index] - 1) % 256
-
-                case ".":
-                    # Imprime o caractere ASCII correspondente ao valor atual da célula
-                    print(chr(self.memory[self.index]), end="")
-
-                case ",":
-                    # Lê um caractere do teclado e armazena o código ASCII na célula atual
-                    self.memory[self.index] = ord(click.getchar(echo=True)) % 256
-
-                case "[":
-                    # Início de um loop: enquanto o valor da célula atual for diferente de zero,
-                    # o código entre [ e ] será executado
-                    cmd = []
-                    open_paren = 1  # Contador de colchetes para lidar com loops aninhados
-
-                    # Lê os caracteres dentro do bloco de loop
-                    for c in chars:
-                        if c == "]":
-                            open_paren -= 1
-                        if c == "[":
-                            open_paren += 1
-                        if open_paren == 0:
-                            break
-                        cmd.append(c)
-                    else:
-                        # Se não encontrar um colchete de fechamento, lança erro de sintaxe
-                        raise SyntaxError
-
-                    body = "".join(cmd)  # Junta o corpo do loop como string
-
-                    # Executa o corpo do loop enquanto o valor da célula atual for diferente de zero
-                    while self.memory[self.index] != 0:
-                        self.run(body)
-
-                case "]":
-                    # Colchete de fechamento isolado não é permitido
-                    raise SyntaxError
+    # De quantas em quantas iterações de loop os limites são verificados
+    CHECK_EVERY = 10_000
+
+    def __init__(self, tape: Tape | None = None, io=None, *,
+                 max_steps: int | None = None, timeout: float | None = None):
+        self.tape = tape if tape is not None else Tape()  # Fita de memória, 10.000 células por padrão
+        self.io = io if io is not None else StreamIO()    # Entrada e saída (veja bfio.py)
+        self.index = 0  # Ponteiro de memória (inicialmente na posição 0)
+
+        # Limites opcionais: passos são iterações de loop (cada vez que a
+        # execução chega a um "]", volte ou não para o "["), o tempo é medido
+        # em segundos a partir do início de run()
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.steps = 0
+        self.deadline: float | None = None
+        self.chunk = 0
+
+    # Prepara os limites para uma execução e retorna o valor inicial do
+    # contador de iterações. Sem limites retorna -1, que nunca chega a zero.
+    def start_ticks(self) -> int:
+        self.steps = 0  # Cada execução tem o seu próprio limite de passos
+        self.deadline = None
+        if self.max_steps is None and self.timeout is None:
+            return -1
+        if self.timeout is not None:
+            self.deadline = time.perf_counter() + self.timeout
+        return self.next_chunk()
+
+    def next_chunk(self) -> int:
+        self.chunk = self.CHECK_EVERY
+        if self.max_steps is not None:
+            self.chunk = min(self.chunk, self.max_steps - self.steps + 1)
+        return self.chunk
+
+    # Chamado a cada CHECK_EVERY iterações de loop (ou antes, perto do
+    # limite de passos). Verifica os limites e retorna o próximo contador.
+    def tick(self) -> int:
+        self.steps += self.chunk
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise StepLimitError(f"limite de {self.max_steps} passos excedido")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise TimeoutError(f"limite de {self.timeout}s excedido")
+        return self.next_chunk()
+
+    # Buffer com o conteúdo da fita
+    @property
+    def memory(self):
+        return self.tape.cells
+
+    # Chamado quando o ponteiro sai da região atual da fita: posições
+    # negativas são erro, à direita a fita cresce. Retorna o novo tamanho.
+    def check_index(self, index: int) -> int:
+        if index < 0:
+            raise IndexError("ponteiro antes do início da fita")
+        return self.tape.grow(index)
+
+    # Método que executa o código Brainfuck. Aceita o código-fonte ou uma
+    # lista de instruções já produzida por compile_bf(); as opções nomeadas
+    # ligam/desligam os passos de otimização (veja bfir.compile_bf)
+    def run(self, src: str | list[Instr], **options):
+        code = compile_bf(src, **options) if isinstance(src, str) else src
+        tape = self.tape
+        memory = tape.cells
+        mask = tape.mask
+        size = len(memory)
+        write = self.io.write
+        read = self.io.read
+        ticks = self.start_ticks()
+        index = self.index
+        pc = 0  # Contador de programa: índice da próxima instrução
+
+        # Laço único de despacho: não há recursão nem reconstrução do corpo
+        # dos loops a cada iteração, apenas saltos para destinos pré-calculados
+        try:
+            while pc < len(code):
+                op, arg = code[pc]
+                match op:
+                    case "add":
+                        # Soma (ou subtrai) arg da célula atual, aplicando a política de overflow
+                        memory[index] = (memory[index] + arg) & mask
+
+                    case "move":
+                        # Move o ponteiro arg posições (negativo = esquerda)
+                        index += arg
+                        if not 0 <= index < size:
+                            size = self.check_index(index)
+
+                    case "out":
+                        # Escreve o valor atual da célula na saída (com buffer)
+                        write(memory[index])
+
+                    case "in":
+                        # Lê um byte da entrada; no fim dela, segue a política de EOF
+                        value = read()
+                        if value is not None:
+                            memory[index] = value & mask
+
+                    case "open":
+                        # Se a célula atual for zero, pula para depois do "]" correspondente
+                        if memory[index] == 0:
+                            pc = arg
+
+                    case "close":
+                        # Cada fim do corpo do loop é um passo, saindo ou não
+                        # dele (o mesmo evento contado pelo código de to_python)
+                        ticks -= 1
+                        if ticks == 0:
+                            ticks = self.tick()  # Verifica os limites de passos/tempo
+                        # Se a célula atual não for zero, volta para o "[" correspondente
+                        if memory[index] != 0:
+                            pc = arg
+
+                    case "clear":
+                        # [-] ou [+]: zera a célula atual
+                        memory[index] = 0
+
+                    case "scan":
+                        # [>] ou [<]: anda até encontrar uma célula com zero
+                        if arg == 1:
+                            index = tape.find_zero(index)
+                            size = len(memory)
+                        else:
+                            while memory[index] != 0:
+                                index += arg
+                                if not 0 <= index < size:
+                                    size = self.check_index(index)
+
+                    case "mul":
+                        # Loop de transferência: distribui múltiplos da célula atual
+                        value = memory[index]
+                        if value != 0:
+                            lo = index + arg[0][0]
+                            hi = index + arg[-1][0]
+                            if lo < 0 or hi >= size:
+                                size = self.check_index(lo if lo < 0 else hi)
+                            for offset, factor in arg:
+                                memory[index + offset] = (memory[index + offset] + value * factor) & mask
+                            memory[index] = 0
+                pc += 1
+        except ValueError as exc:
+            # Com a política "error" o buffer recusa valores fora da célula.
+            # Erros das funções chamadas (como a saída) seguem como estão.
+            if not raised_in(exc, BF.run.__code__):
+                raise
+            raise OverflowError(f"overflow na célula {index}") from exc
+        finally:
+            self.index = index
+            self.io.flush()
+
+    # Executa o programa traduzido para Python (veja to_python). Bem mais
+    # rápido que run() para programas longos; o objeto de código fica em
+    # cache, então execuções repetidas do mesmo programa não traduzem nada.
+    def run_python(self, src: str, cache_dir: str | Path | None = None, **options):
+        ticks = self.start_ticks()
+        try:
+            code_obj = load_python(src, cache_dir, limited=ticks != -1, **options)
+        except SyntaxError:
+            # O Python limita a quantidade de blocos aninhados; programas com
+            # loops muito profundos (ou inválidos) ficam com o interpretador
+            return self.run(src, **options)
+        namespace: dict = {}
+        exec(code_obj, namespace)
+        tape = self.tape
+        bf_main = namespace["bf_main"]
+        try:
+            self.index = bf_main(
+                tape.cells, self.index, tape.mask, self.io.write, self.io.read,
+                self.check_index, tape.find_zero, ticks, self.tick,
+            )
+        except ValueError as exc:
+            if not raised_in(exc, bf_main.__code__):
+                raise
+            raise OverflowError("overflow em uma célula da fita") from exc
+        finally:
+            self.io.flush()
+
+
+# Verifica se a exceção foi gerada no próprio código code (como uma escrita
+# na fita, que não passa por outra função) e não em uma função chamada por ele
+def raised_in(exc: BaseException, code: CodeType) -> bool:
+    tb = exc.__traceback__
+    while tb is not None and tb.tb_next is not None:
+        tb = tb.tb_next
+    return tb is not None and tb.tb_frame.f_code is code
 
 
 # Função principal que carrega o arquivo e executa o interpretador
-def main():
-    vm = BF()  # Cria instância da máquina virtual
-    filename = sys.argv[-1]  # Pega o nome do arquivo passado por argumento
+@click.command()
+@click.argument("filename", type=click.Path(exists=True, dir_okay=False))
+@click.option("--fold/--no-fold", default=True, help="Agrupa +/- e >/< repetidos.")
+@click.option("--clear/--no-clear", default=True, help="Trata [-] e [+] como zerar célula.")
+@click.option("--scan/--no-scan", default=True, help="Trata [>] e [<] como busca por zero.")
+@click.option("--mul/--no-mul", default=True, help="Trata loops de transferência como multiplicação.")
+@click.option("--backend", type=click.Choice(["interp", "python"]), default="interp",
+              help="Interpretador de instruções ou tradução para Python.")
+@click.option("--cache-dir", type=click.Path(file_okay=False), default=None,
+              help="Diretório para guardar programas traduzidos (backend python).")
+@click.option("--cells", type=int, default=10_000, help="Tamanho inicial da fita.")
+@click.option("--cell-bits", type=click.Choice(["8", "16", "32"]), default="8", help="Largura de cada célula.")
+@click.option("--overflow", type=click.Choice(["wrap", "error"]), default="wrap",
+              help="Política para valores fora do intervalo da célula.")
+@click.option("--mmap", "use_mmap", is_flag=True, help="Fita de tamanho fixo em uma região mmap.")
+@click.option("--io", "io_mode", type=click.Choice(["auto", "stream", "interactive"]), default="auto",
+              help="Entrada/saída com buffer ou interativa (padrão: interativa só em terminais).")
+@click.option("--input", "input_file", type=click.File("rb"), default=None, help="Lê a entrada deste arquivo.")
+@click.option("--output", "output_file", type=click.File("wb"), default=None, help="Escreve a saída neste arquivo.")
+@click.option("--eof", type=click.Choice(list(EOF_POLICIES)), default="zero", help="Valor lido no fim da entrada.")
+@click.option("--profile", is_flag=True, help="Mostra os loops mais custosos ao final (só interpretador).")
+@click.option("--flamegraph", type=click.Path(dir_okay=False), default=None,
+              help="Grava pilhas no formato collapsed stacks para flame graphs (implica --profile).")
+def main(filename, backend, cache_dir, cells, cell_bits, overflow, use_mmap,
+         io_mode, input_file, output_file, eof, profile, flamegraph, **options):
+    # Escolhe a camada de entrada/saída
+    if io_mode == "auto":
+        interactive = input_file is None and output_file is None and sys.stdin.isatty()
+        io_mode = "interactive" if interactive else "stream"
+    if io_mode == "interactive":
+        io = ClickIO()
+    else:
+        io = StreamIO(input_file, output_file, eof=eof)
+
+    # Cria instância da máquina virtual
+    tape = Tape(cells, cell_bits=int(cell_bits), overflow=overflow, use_mmap=use_mmap)
+    if profile or flamegraph:
+        from bfprof import ProfiledBF  # Só carrega o profiler quando pedido
+
+        vm = ProfiledBF(tape, io)
+        backend = "interp"
+    else:
+        vm = BF(tape, io)
 
     with open(filename, "r") as fd:
         source = fd.read()  # Lê o conteúdo do arquivo
 
-    vm.run(source)  # Executa o código Brainfuck
+    # Executa o código Brainfuck
+    if backend == "python":
+        vm.run_python(source, cache_dir, **options)
+    else:
+        vm.run(source, **options)
+
+    if profile or flamegraph:
+        print(vm.profile.report(), file=sys.stderr)
+    if flamegraph:
+        with open(flamegraph, "w") as fd:
+            fd.write(vm.profile.collapsed_stacks())
 
 
 # Ponto de entrada do programa
@@ -1,58 +1,247 @@
 #!/usr/bin/python3
+import hashlib
+import os
+import subprocess
 import sys
+import tempfile
+from pathlib import Path
 import click  # pip3 install click/apt install python3-click
+from bfir import compile_bf
+
+# Tipo C de cada célula, conforme a largura escolhida
+C_CELL_TYPES = {8: "unsigned char", 16: "unsigned short", 32: "unsigned int"}
+
+# Código C para "," de acordo com a política de EOF (veja bfio.py)
+C_EOF_READS = {
+    "zero": "c = getchar(); memory[index] = c == EOF ? 0 : c;",
+    "minus-one": "c = getchar(); memory[index] = c == EOF ? (cell) -1 : c;",
+    "unchanged": "c = getchar(); if (c != EOF) memory[index] = c;",
+}
 
 c_template = """
 #include<stdio.h>
+#include<stdlib.h>
+#include<string.h>
+
+typedef {cell} cell;
+
+static cell *memory;
+static size_t size = {size};
+
+int main() {{
+    long index = 0;
+    int c;  // Usado por ","
+    (void) c;
+
+    memory = calloc(size, sizeof(cell));
+    setvbuf(stdout, NULL, _IOFBF, 1 << 16);
+"""
+
+# Fita dinâmica: começa com {size} células e dobra com realloc sempre que o
+# ponteiro passa do fim, como a fita do interpretador (tape.Tape)
+c_dynamic_template = """
+#include<stdio.h>
+#include<stdlib.h>
+#include<string.h>
+
+typedef {cell} cell;
+
+static cell *memory;
+static size_t size = {size};
+
+static void grow(size_t index) {{
+    size_t old = size;
+    while (size <= index) size *= 2;
+    memory = realloc(memory, size * sizeof(cell));
+    if (memory == NULL) {{
+        fputs("sem memória para a fita\\n", stderr);
+        exit(1);
+    }}
+    memset(memory + old, 0, (size - old) * sizeof(cell));
+}}
 
-int main() {
-    char memory[10000];
-    int index = 0;
+#define CHECK(i) if ((size_t) (i) >= size) grow(i)
 
-    for (int i=0; i < 10000; i++) {
-        memory[i] = 0;
-    }
+int main() {{
+    long index = 0;
+    int c;  // Usado por ","
+    (void) c;
+
+    memory = calloc(size, sizeof(cell));
+    setvbuf(stdout, NULL, _IOFBF, 1 << 16);
+"""
+
+c_footer = """
+    fflush(stdout);
+    return 0;
+}
 """
 
 
 class BF:
-    def __init__(self):
+    def __init__(self, dynamic: bool = False, cell_bits: int = 8, eof: str = "zero"):
         self.lines = []
-        
-    def run(self, src: str):
-        chars = iter(src)
-        for c in chars:
-            match c:
-                case ">":
-                    print("    index += 1;")
-                case "<":
-                    print("    index -= 1;")
-                case "+":
-                    print("    memory[index]++;")
-                case "-":
-                    print("    memory[index]--;")
-                case ".":
-                    print('    printf("%c", memory[index]);')
-                case ",":
-                    print('    memory[index] = getchar(); fflush(stdin);')
-                case "[":
-                    print("    while(memory[index] != 0) {")
-                case "]":
-                    print("    }")
-
-
-def main():
-    vm = BF()
-    filename = sys.argv[-1]
-    
+        self.dynamic = dynamic      # Gera verificações para a fita dinâmica
+        self.cell_bits = cell_bits  # memchr só funciona com células de 1 byte
+        self.eof = eof
+        self.depth = 1              # Nível de indentação atual
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.depth + line)
+
+    # Na fita dinâmica, todo avanço do ponteiro verifica se é preciso crescer
+    def check(self, expr: str):
+        if self.dynamic:
+            self.emit(f"CHECK({expr});")
+
+    def run(self, src: str, **options):
+        # Gera o código C a partir da IR otimizada (veja bfir.compile_bf)
+        code = compile_bf(src, **options)
+        i = 0
+        while i < len(code):
+            op, arg = code[i]
+            match op:
+                case "move":
+                    self.emit(f"index += {arg};")
+                    if arg > 0:
+                        self.check("index")
+                case "add":
+                    self.emit(f"memory[index] += {arg};")
+                case "out":
+                    self.emit("putchar(memory[index]);")
+                case "in":
+                    self.emit("fflush(stdout);")
+                    self.emit(C_EOF_READS[self.eof])
+                case "open":
+                    self.emit("while (memory[index]) {")
+                    self.depth += 1
+                case "close":
+                    self.depth -= 1
+                    self.emit("}")
+                case "clear":
+                    # Sequências [-]>[-]>[-] viram um único memset
+                    n = clear_run(code, i)
+                    if n > 1:
+                        self.check(f"index + {n - 1}")
+                        self.emit(f"memset(memory + index, 0, {n} * sizeof(cell));")
+                        self.emit(f"index += {n - 1};")
+                        i += 2 * (n - 1)
+                    else:
+                        self.emit("memory[index] = 0;")
+                case "scan" if arg == 1 and self.cell_bits == 8:
+                    # [>] procura o próximo zero com memchr
+                    self.emit("{")
+                    self.emit("    cell *zero = memchr(memory + index, 0, size - index);")
+                    if self.dynamic:
+                        self.emit("    if (zero == NULL) { index = size; grow(index); }")
+                        self.emit("    else index = zero - memory;")
+                    else:
+                        # A fita fixa não cresce: sem zero até o fim, o programa para
+                        self.emit("    if (zero == NULL) {")
+                        self.emit('        fputs("ponteiro além do fim da fita\\n", stderr);')
+                        self.emit("        exit(1);")
+                        self.emit("    }")
+                        self.emit("    index = zero - memory;")
+                    self.emit("}")
+                case "scan":
+                    self.emit("while (memory[index]) {")
+                    self.emit(f"    index += {arg};")
+                    if arg > 0 and self.dynamic:
+                        self.emit("    CHECK(index);")
+                    self.emit("}")
+                case "mul":
+                    self.emit("if (memory[index]) {")
+                    self.depth += 1
+                    if arg[-1][0] > 0:
+                        self.check(f"index + {arg[-1][0]}")
+                    for offset, factor in arg:
+                        self.emit(f"memory[index + {offset}] += memory[index] * {factor};")
+                    self.emit("memory[index] = 0;")
+                    self.depth -= 1
+                    self.emit("}")
+            i += 1
+
+    # Retorna o programa C completo
+    def to_c(self, src: str, size: int = 10_000, **options) -> str:
+        self.lines = []
+        self.run(src, **options)
+        template = c_dynamic_template if self.dynamic else c_template
+        header = template.format(cell=C_CELL_TYPES[self.cell_bits], size=size)
+        return header + "\n".join(self.lines) + c_footer
+
+
+# Conta quantas instruções "clear" seguidas de ("move", 1) existem a partir
+# da posição i, ex.: [-]>[-]>[-] conta 3
+def clear_run(code, i: int) -> int:
+    n = 1
+    while code[i + 1 : i + 3] == [("move", 1), ("clear", 0)]:
+        n += 1
+        i += 2
+    return n
+
+
+# Diretório padrão onde ficam os executáveis já compilados
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "bfc"
+
+
+# Compila o código C com o compilador local e retorna o caminho do
+# executável. O resultado fica em cache, indexado pelo hash do código C
+# gerado (que depende do programa e das opções) e das opções do compilador;
+# se nada mudou, nenhum compilador é chamado.
+def build(c_src: str, *, cc: str = "cc", opt_level: str = "2", cache_dir: Path | None = None) -> Path:
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    key = hashlib.sha256(f"{cc}\0-O{opt_level}\0{c_src}".encode()).hexdigest()
+    exe = cache_dir / key
+    if exe.exists():
+        return exe
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp:
+        c_path = Path(tmp) / "prog.c"
+        c_path.write_text(c_src)
+        tmp_exe = Path(tmp) / "prog"
+        subprocess.run([cc, f"-O{opt_level}", "-o", str(tmp_exe), str(c_path)], check=True)
+        tmp_exe.replace(exe)  # Renomeia de forma atômica para o cache
+    return exe
+
+
+@click.command()
+@click.argument("filename", type=click.Path(exists=True, dir_okay=False))
+@click.option("--fold/--no-fold", default=True, help="Agrupa +/- e >/< repetidos.")
+@click.option("--clear/--no-clear", default=True, help="Trata [-] e [+] como zerar célula.")
+@click.option("--scan/--no-scan", default=True, help="Trata [>] e [<] como busca por zero.")
+@click.option("--mul/--no-mul", default=True, help="Trata loops de transferência como multiplicação.")
+@click.option("--cells", type=int, default=10_000, help="Tamanho (inicial) da fita.")
+@click.option("--cell-bits", type=click.Choice(["8", "16", "32"]), default="8", help="Largura de cada célula.")
+@click.option("--dynamic-tape", is_flag=True, help="Fita que cresce sob demanda, como no bf.py.")
+@click.option("--eof", type=click.Choice(list(C_EOF_READS)), default="zero", help="Valor lido no fim da entrada.")
+@click.option("--build", "mode", flag_value="build", help="Compila e imprime o caminho do executável.")
+@click.option("--run", "mode", flag_value="run", help="Compila (se preciso) e executa o programa.")
+@click.option("-O", "opt_level", type=click.Choice(["0", "1", "2", "3", "s"]), default="2",
+              help="Nível de otimização do compilador C.")
+@click.option("--cc", default=lambda: os.environ.get("CC", "cc"), help="Compilador C (padrão: $CC ou cc).")
+@click.option("--cache-dir", type=click.Path(file_okay=False), default=None,
+              help="Diretório do cache de executáveis (padrão: ~/.cache/bfc).")
+def main(filename, cells, cell_bits, dynamic_tape, eof, mode, opt_level, cc, cache_dir, **options):
+    vm = BF(dynamic_tape, int(cell_bits), eof)
+
     with open(filename, "r") as fd:
         source = fd.read()
 
-    print(c_template)
-    vm.run(source)
-    print("   return 0;")
-    print("}")
+    c_src = vm.to_c(source, cells, **options)
+    if mode is None:
+        print(c_src)
+        return
+
+    exe = build(c_src, cc=cc, opt_level=opt_level, cache_dir=cache_dir)
+    if mode == "build":
+        print(exe)
+    else:
+        sys.stdout.flush()
+        os.execv(exe, [str(exe)])
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
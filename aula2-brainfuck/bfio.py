@@ -0,0 +1,111 @@
+"""
+Camada de entrada e saída da máquina Brainfuck.
+
+Todas as implementações têm a mesma interface:
+
+    write(value)  escreve o valor de uma célula
+    read()        lê um byte; no fim da entrada segue a política de EOF
+    flush()       envia para o destino tudo o que estiver no buffer
+
+Políticas de EOF (o que "," faz quando a entrada acabou):
+
+* "zero": grava 0 na célula
+* "minus-one": grava -1 (255 em células de 8 bits)
+* "unchanged": não altera a célula (read() retorna None)
+"""
+import io
+import sys
+from typing import BinaryIO
+
+import click  # type: ignore
+
+EOF_POLICIES = {"zero": 0, "minus-one": -1, "unchanged": None}
+
+
+class StreamIO:
+    """
+    Entrada e saída binárias com buffer sobre streams quaisquer (por padrão
+    stdin/stdout do processo). A saída é acumulada e enviada quando o buffer
+    enche, antes de cada leitura que precise esperar por dados e ao final da
+    execução. A entrada é lida em blocos.
+    """
+
+    def __init__(
+        self,
+        stdin: BinaryIO | None = None,
+        stdout: BinaryIO | None = None,
+        *,
+        eof: str = "zero",
+        buffer_size: int = 64 * 1024,
+    ):
+        if eof not in EOF_POLICIES:
+            raise ValueError(f"política de EOF inválida: {eof}")
+        self.stdin = stdin if stdin is not None else sys.stdin.buffer
+        self.stdout = stdout if stdout is not None else sys.stdout.buffer
+        self.eof_value = EOF_POLICIES[eof]
+        self.buffer_size = buffer_size
+        self.out_buffer = bytearray()
+        self.in_buffer = b""
+        self.in_pos = 0
+        self.bytes_read = 0  # Bytes efetivamente lidos (sem contar o fim da entrada)
+
+    def write(self, value: int):
+        try:
+            self.out_buffer.append(value)
+        except ValueError:
+            # Células maiores que 8 bits: escreve o caractere em UTF-8
+            self.out_buffer += chr(value).encode("utf8")
+        if len(self.out_buffer) >= self.buffer_size:
+            self.flush()
+
+    def read(self) -> int | None:
+        if self.in_pos >= len(self.in_buffer):
+            self.flush()  # O programa pode estar esperando resposta a um prompt
+            read = getattr(self.stdin, "read1", self.stdin.read)
+            self.in_buffer = read(self.buffer_size)
+            self.in_pos = 0
+            if not self.in_buffer:
+                return self.eof_value
+        value = self.in_buffer[self.in_pos]
+        self.in_pos += 1
+        self.bytes_read += 1
+        return value
+
+    def flush(self):
+        if self.out_buffer:
+            self.stdout.write(self.out_buffer)
+            self.out_buffer.clear()
+        self.stdout.flush()
+
+
+class MemoryIO(StreamIO):
+    """
+    Entrada a partir de bytes em memória e saída acumulada em memória,
+    útil para testes e execuções em lote.
+    """
+
+    def __init__(self, data: bytes = b"", *, eof: str = "zero"):
+        super().__init__(io.BytesIO(data), io.BytesIO(), eof=eof)
+
+    def getvalue(self) -> bytes:
+        self.flush()
+        return self.stdout.getvalue()  # type: ignore
+
+
+class ClickIO:
+    """
+    Modo interativo: lê cada tecla diretamente do terminal, com eco, e
+    imprime cada caractere assim que ele é produzido.
+    """
+
+    bytes_read = 0
+
+    def write(self, value: int):
+        print(chr(value), end="", flush=True)
+
+    def read(self) -> int | None:
+        self.bytes_read += 1
+        return ord(click.getchar(echo=True))
+
+    def flush(self):
+        sys.stdout.flush()
@@ -0,0 +1,177 @@
+"""
+Representação intermediária (IR) otimizada para Brainfuck, compartilhada pelo
+interpretador (bf.py) e pelo gerador de C (bfc.py).
+
+Cada instrução é um par (operação, argumento):
+
+    ("add", n)      soma n à célula atual (n pode ser negativo)
+    ("move", n)     desloca o ponteiro em n posições
+    ("out", 0)      escreve a célula atual
+    ("in", 0)       lê um byte para a célula atual
+    ("open", j)     início de loop; j é o índice do "close" correspondente
+    ("close", j)    fim de loop; j é o índice do "open" correspondente
+    ("clear", 0)    zera a célula atual: [-] ou [+]
+    ("scan", n)     anda de n em n até achar uma célula zero: [>], [<], [>>]...
+    ("mul", pares)  para cada (deslocamento, fator) faz
+                    célula[p + deslocamento] += célula[p] * fator e depois
+                    zera a célula atual: [->+>++<<] etc.
+
+Cada otimização pode ser desligada separadamente para medir seu efeito.
+"""
+from typing import Any
+
+ADD = "add"
+MOVE = "move"
+OUT = "out"
+IN = "in"
+OPEN = "open"
+CLOSE = "close"
+CLEAR = "clear"
+SCAN = "scan"
+MUL = "mul"
+
+Instr = tuple[str, Any]
+
+# Instruções geradas diretamente por cada caractere do código-fonte
+SIMPLE = {
+    "+": (ADD, 1),
+    "-": (ADD, -1),
+    ">": (MOVE, 1),
+    "<": (MOVE, -1),
+    ".": (OUT, 0),
+    ",": (IN, 0),
+}
+
+
+def compile_bf(
+    src: str,
+    *,
+    fold: bool = True,
+    clear: bool = True,
+    scan: bool = True,
+    mul: bool = True,
+    positions: list[int] | None = None,
+) -> list[Instr]:
+    """
+    Converte o código-fonte em uma lista plana de instruções da IR, com os
+    destinos dos saltos já calculados.
+
+    Os argumentos nomeados ligam ou desligam cada passo de otimização:
+
+    * fold: agrupa sequências de +/- e >/< em uma única instrução (ou duas,
+      veja abaixo)
+    * clear: reconhece [-] e [+]
+    * scan: reconhece [>] e [<]
+    * mul: reconhece loops de transferência como [->+>++<<]
+
+    Se a lista positions for passada, ela recebe, para cada instrução, a
+    posição no código-fonte do caractere que a originou (o primeiro de uma
+    sequência agrupada, ou o "[" de um loop simplificado).
+
+    O agrupamento preserva os erros de ponteiro: uma sequência de >/< que
+    passa à esquerda dos dois extremos (como "<>" ou "<<>>>") vira dois
+    deslocamentos, um até o ponto mais à esquerda e outro de volta, para que
+    sair pelo início da fita continue gerando IndexError.
+    """
+    code: list[Instr] = []
+    pos: list[int] = []    # Posição no código-fonte de cada instrução
+    stack: list[int] = []  # Posições dos "open" ainda não fechados
+    # Sequência de >/< no fim de code: (instruções, deslocamento total, mínimo)
+    moves: tuple[int, int, int] | None = None
+
+    for i, c in enumerate(src):
+        if c in SIMPLE:
+            op, n = SIMPLE[c]
+            if fold and op == MOVE:
+                count, total, low = moves if moves is not None else (0, 0, 0)
+                if count:
+                    del code[-count:]
+                    i = pos[-count]
+                    del pos[-count:]
+                total += n
+                low = min(low, total)
+                run = [(MOVE, low), (MOVE, total - low)] if total > low < 0 else [(MOVE, total)] if total else []
+                code.extend(run)
+                pos.extend([i] * len(run))
+                moves = (len(run), total, low)
+                continue
+            moves = None
+            # Agrupa com a instrução anterior se ela for do mesmo tipo
+            if fold and op == ADD and code and code[-1][0] == op:
+                n += code.pop()[1]
+                i = pos.pop()
+                if n == 0:
+                    continue  # +- se anulam
+            code.append((op, n))
+            pos.append(i)
+
+        elif c == "[":
+            moves = None
+            stack.append(len(code))
+            code.append((OPEN, 0))  # Destino preenchido ao encontrar o "]"
+            pos.append(i)
+
+        elif c == "]":
+            moves = None
+            if not stack:
+                raise SyntaxError("']' sem '[' correspondente")
+            start = stack.pop()
+            loop = simplify_loop(code[start + 1 :], clear=clear, scan=scan, mul=mul)
+            if loop is not None:
+                del code[start:]
+                del pos[start + 1 :]
+                code.append(loop)
+            else:
+                code[start] = (OPEN, len(code))
+                code.append((CLOSE, start))
+                pos.append(i)
+
+    if stack:
+        raise SyntaxError("'[' sem ']' correspondente")
+    if positions is not None:
+        positions[:] = pos
+    return code
+
+
+def simplify_loop(
+    body: list[Instr], *, clear: bool, scan: bool, mul: bool
+) -> Instr | None:
+    """
+    Tenta substituir um loop sem loops internos por uma única instrução.
+    Retorna None se o corpo não corresponder a nenhum padrão conhecido.
+    """
+    # Apenas loops formados só por somas e deslocamentos são analisados
+    if not body or any(op not in (ADD, MOVE) for op, _ in body):
+        return None
+
+    if scan and len(body) == 1 and body[0][0] == MOVE:
+        return (SCAN, body[0][1])
+
+    # Simula o corpo acumulando quanto cada célula (relativa ao ponteiro
+    # inicial) recebe em uma iteração
+    offset = low = 0
+    deltas: dict[int, int] = {}
+    for op, n in body:
+        if op == MOVE:
+            offset += n
+            low = min(low, offset)
+        else:
+            deltas[offset] = deltas.get(offset, 0) + n
+
+    # O ponteiro precisa voltar ao ponto de partida e a célula de controle
+    # precisa diminuir de 1 em 1 (ou aumentar, no caso de [+])
+    if offset != 0:
+        return None
+    step = deltas.pop(0, 0)
+    targets = tuple((k, v) for k, v in sorted(deltas.items()) if v != 0)
+
+    if not targets:
+        if clear and step in (-1, 1) and low == 0:
+            return (CLEAR, 0)
+        return None
+    # A multiplicação só verifica a fita até o menor alvo; se o corpo anda
+    # mais à esquerda que isso, o loop fica como está para que a saída pelo
+    # início da fita continue gerando IndexError
+    if mul and step == -1 and low >= min(0, targets[0][0]):
+        return (MUL, targets)
+    return None
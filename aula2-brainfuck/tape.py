@@ -0,0 +1,101 @@
+"""
+Fita de memória da máquina Brainfuck.
+
+A fita guarda inteiros sem sinal em um buffer compacto (bytearray para
+células de 8 bits, array para 16 ou 32 bits) em vez de uma lista de objetos
+int, ocupando cerca de 8x menos memória. Ela pode crescer sob demanda quando
+o ponteiro passa do fim ou, para fitas muito grandes, ocupar uma região de
+tamanho fixo obtida com mmap.
+
+Política de overflow das células:
+
+* "wrap": os valores dão a volta (255 + 1 == 0 em células de 8 bits)
+* "error": sair do intervalo da célula lança OverflowError
+"""
+import mmap
+from array import array
+
+# Tipo do array usado para cada largura de célula
+CELL_TYPECODES = {8: "B", 16: "H", 32: "I"}
+OVERFLOW_POLICIES = ("wrap", "error")
+
+
+class Tape:
+    def __init__(
+        self,
+        size: int = 10_000,
+        *,
+        cell_bits: int = 8,
+        overflow: str = "wrap",
+        use_mmap: bool = False,
+    ):
+        if cell_bits not in CELL_TYPECODES:
+            raise ValueError(f"largura de célula inválida: {cell_bits}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"política de overflow inválida: {overflow}")
+
+        self.cell_bits = cell_bits
+        self.overflow = overflow
+        self.growable = not use_mmap
+
+        # Com "wrap", o valor é reduzido com & mask. Com "error", a máscara
+        # não altera nada (x & -1 == x) e o próprio buffer recusa valores
+        # fora do intervalo da célula.
+        self.mask = (1 << cell_bits) - 1 if overflow == "wrap" else -1
+
+        typecode = CELL_TYPECODES[cell_bits]
+        if use_mmap:
+            # Região anônima de tamanho fixo: o sistema só aloca as páginas
+            # que forem de fato tocadas
+            self._mmap = mmap.mmap(-1, size * cell_bits // 8)
+            self.cells = self._mmap if cell_bits == 8 else memoryview(self._mmap).cast(typecode)
+        elif cell_bits == 8:
+            self.cells = bytearray(size)
+        else:
+            self.cells = array(typecode, bytes(size * cell_bits // 8))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __setitem__(self, index, value):
+        self.cells[index] = value
+
+    def grow(self, index: int) -> int:
+        """
+        Garante que a posição index exista, dobrando o tamanho da fita quantas
+        vezes for necessário. Retorna o novo tamanho.
+
+        Fitas mmap têm tamanho fixo e lançam IndexError.
+        """
+        size = len(self.cells)
+        if index < size:
+            return size
+        if not self.growable:
+            raise IndexError(f"posição {index} fora da fita de {size} células")
+
+        new_size = max(size, 1)
+        while new_size <= index:
+            new_size *= 2
+        self.cells.extend(bytes(new_size - size) if self.cell_bits == 8 else [0] * (new_size - size))
+        return new_size
+
+    def find_zero(self, start: int) -> int:
+        """
+        Retorna a primeira posição >= start com valor zero, usada por [>].
+        Se não houver nenhuma, a fita cresce e a primeira célula nova é usada.
+        """
+        cells = self.cells
+        if self.cell_bits == 8:
+            pos = cells.find(b"\0", start)
+            if pos != -1:
+                return pos
+        else:
+            for pos in range(start, len(cells)):
+                if cells[pos] == 0:
+                    return pos
+        pos = max(start, len(cells))
+        self.grow(pos)
+        return pos
@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+"""
+Benchmark do parser JSON (my_json.read_json) contra o json.loads.
+
+Gera corpora de formatos variados (aninhamento profundo, arrays largos,
+strings longas, muitos números, muitos objetos) em cada tamanho pedido e mede
+cada parser com aquecimento e várias repetições usando perf_counter. Para
+cada combinação reporta o melhor tempo, a mediana, a vazão em MiB/s e o pico
+de memória medido com tracemalloc, e pode gravar tudo em JSON.
+
+Com --baseline, compara a vazão com um resultado gravado antes e termina com
+erro se algum caso ficou mais lento que o limite tolerado:
+
+    python3 bench.py --size 1K --size 1M --size 100M --json base.json
+    python3 bench.py --size 1K --size 1M --baseline base.json --max-regression 0.1
+"""
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import click  # type: ignore
+
+from my_json import read_json
+
+PARSERS: dict[str, Callable[[str], Any]] = {
+    "json.loads": json.loads,
+    "read_json": read_json,
+    "read_json-array": lambda src: read_json(src, numeric_arrays="array"),
+}
+
+# Profundidade de cada documento aninhado. O read_json é recursivo, então o
+# valor fica bem abaixo do limite de recursão do Python.
+DEPTH = 200
+
+
+# Cada gerador produz um item do formato; o corpus é um array desses itens
+# com o tamanho pedido
+def deep_item(rng: random.Random) -> Any:
+    value: Any = rng.randint(0, 9)
+    for i in range(DEPTH):
+        value = [value] if i % 2 else {"k": value}
+    return value
+
+
+def wide_item(rng: random.Random) -> Any:
+    return [rng.choice([0, 1, True, False, None]) for _ in range(1000)]
+
+
+def long_string_item(rng: random.Random) -> Any:
+    text = "".join(rng.choice("abcdefghij klmnop") for _ in range(10_000))
+    # Um escape de vez em quando força o caminho lento das strings
+    return text[:5000] + '\\"\n\t' + text[5000:] if rng.random() < 0.5 else text
+
+
+def numbers_item(rng: random.Random) -> Any:
+    return [rng.choice([rng.randint(-(10**9), 10**9), rng.uniform(-1e6, 1e6), rng.random() * 1e-20]) for _ in range(100)]
+
+
+def objects_item(rng: random.Random) -> Any:
+    return {
+        "id": rng.randint(0, 10**6),
+        "nome": f"aluno {rng.randint(0, 999)}",
+        "nota": round(rng.uniform(0, 10), 1),
+        "ativo": rng.random() < 0.5,
+        "tags": ["a", "b"][: rng.randint(0, 2)],
+        "endereco": {"cidade": "Brasília", "uf": "DF"},
+    }
+
+
+SHAPES: dict[str, Callable[[random.Random], Any]] = {
+    "deep": deep_item,
+    "wide": wide_item,
+    "long_strings": long_string_item,
+    "numbers": numbers_item,
+    "objects": objects_item,
+}
+
+
+def make_corpus(shape: str, size: int, seed: int = 0) -> str:
+    """
+    Documento JSON do formato pedido com cerca de size caracteres (o primeiro
+    item é sempre incluído, então corpora pequenos podem passar do tamanho).
+    """
+    rng = random.Random(seed)
+    make = SHAPES[shape]
+    parts = []
+    total = 2
+    while True:
+        item = json.dumps(make(rng), ensure_ascii=False)
+        if parts and total + len(item) + 2 > size:
+            break
+        parts.append(item)
+        total += len(item) + 2
+    return "[" + ", ".join(parts) + "]"
+
+
+def parse_size(text: str) -> int:
+    units = {"K": 2**10, "M": 2**20, "G": 2**30}
+    text = text.strip().upper().removesuffix("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+# Mede um parser: retorna (tempos, pico de memória em bytes)
+def time_parser(parse: Callable[[str], Any], src: str, warmup: int, repeat: int) -> tuple[list[float], int]:
+    for _ in range(warmup):
+        parse(src)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parse(src)
+        times.append(time.perf_counter() - t0)
+
+    # Pico de memória: o documento construído mais as strings e listas
+    # temporárias do parser. Fica fora das execuções cronometradas porque o
+    # tracemalloc intercepta cada alocação, o que pesa justamente nos formatos
+    # com muitos objetos pequenos
+    tracemalloc.start()
+    parse(src)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak
+
+
+# Casos com vazão abaixo de (1 - max_regression) vezes a da referência
+def regressions(results: list[dict], baseline: dict, max_regression: float) -> list[str]:
+    reference = {(r["shape"], r["size"], r["parser"]): r["mib_per_second"] for r in baseline["results"]}
+    failures = []
+    for r in results:
+        before = reference.get((r["shape"], r["size"], r["parser"]))
+        if before and r["mib_per_second"] < before * (1 - max_regression):
+            failures.append(
+                f"{r['shape']} {r['size']} {r['parser']}: {before:.2f} -> {r['mib_per_second']:.2f} MiB/s"
+            )
+    return failures
+
+
+@click.command()
+@click.option("--size", "sizes", multiple=True, default=["1K", "1M"], show_default=True,
+              help="Tamanho de cada corpus, como 100, 64K, 10M ou 200M (pode repetir).")
+@click.option("--shape", "shapes", multiple=True, type=click.Choice(list(SHAPES)),
+              help="Roda só estes formatos (pode repetir).")
+@click.option("--parser", "parsers", multiple=True, type=click.Choice(list(PARSERS)),
+              help="Roda só estes parsers (pode repetir).")
+@click.option("--repeat", default=5, help="Execuções medidas por caso.")
+@click.option("--warmup", default=1, help="Execuções de aquecimento, descartadas.")
+@click.option("--seed", default=0, help="Semente dos geradores de corpus.")
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Grava os resultados neste arquivo.")
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False),
+              help="Resultado anterior (--json) para detectar regressões de vazão.")
+@click.option("--max-regression", default=0.1, show_default=True,
+              help="Perda de vazão tolerada em relação ao --baseline (0.1 = 10%).")
+def main(sizes, shapes, parsers, repeat, warmup, seed, json_path, baseline, max_regression):
+    results = []
+
+    print(f"{'formato':<13} {'tamanho':>10} {'parser':<15} {'melhor (s)':>11} {'mediana (s)':>12} {'MiB/s':>8} {'pico (MiB)':>11}")
+    for size_text in sizes:
+        size = parse_size(size_text)
+        for shape in shapes or SHAPES:
+            src = make_corpus(shape, size, seed)
+            mib = len(src.encode("utf8")) / 2**20
+            for name, parse in PARSERS.items():
+                if parsers and name not in parsers:
+                    continue
+                times, peak = time_parser(parse, src, warmup, repeat)
+                best = min(times)
+                result = {
+                    "shape": shape,
+                    "size": size,
+                    "bytes": len(src.encode("utf8")),
+                    "parser": name,
+                    "times": times,
+                    "best": best,
+                    "median": statistics.median(times),
+                    "mib_per_second": mib / best if best else None,
+                    "peak_memory": peak,
+                }
+                results.append(result)
+                print(
+                    f"{shape:<13} {size_text:>10} {name:<15} {best:>11.4f} {result['median']:>12.4f} "
+                    f"{result['mib_per_second']:>8.2f} {peak / 2**20:>11.2f}"
+                )
+            del src
+
+    if json_path:
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "warmup": warmup,
+            "seed": seed,
+            "results": results,
+        }
+        Path(json_path).write_text(json.dumps(report, indent=2))
+
+    if baseline:
+        failures = regressions(results, json.loads(Path(baseline).read_text()), max_regression)
+        for failure in failures:
+            print(f"regressão: {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
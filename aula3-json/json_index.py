@@ -0,0 +1,223 @@
+"""
+Consultas sob demanda em documentos JSON grandes.
+
+Em vez de construir todas as listas, dicionários e strings do documento, um
+JsonIndex primeiro registra a posição de cada caractere estrutural ([ ] { } ,
+e :) fora de strings e liga cada abertura ao seu fechamento. Com NumPy
+instalado, o índice é calculado com operações vetorizadas sobre o documento
+inteiro; sem ele, com uma passada de expressão regular e uma pilha. Uma consulta como $.items[3].name
+então só anda pelos filhos diretos dos contêineres no caminho, pulando cada
+subárvore inteira de uma vez, e apenas o valor final é lido com o Reader do
+my_json.
+
+    index = JsonIndex(src)
+    index.query("$.items[3].name")
+    index.query('$["chave com espaço"][-1]')
+"""
+import re
+from bisect import bisect_left
+from typing import Any
+
+from my_json import WS, Reader
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+# Strings inteiras (para serem puladas) ou um caractere estrutural (grupo 1).
+# A forma "desenrolada" da string consome os trechos sem escapes em bloco.
+STRUCTURE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|([\[\]{},:])')
+
+OPEN = {"[": "]", "{": "}"}
+
+# Um passo do caminho: .nome, [3] ou ["nome"]
+PATH_STEP = re.compile(r'\.([A-Za-z_][\w-]*)|\[(-?\d+)\]|\["((?:[^"\\]|\\.)*)"\]')
+
+
+class JsonIndex:
+    def __init__(self, src: str):
+        self.src = src
+        self.reader = Reader(src)
+        # Posições dos caracteres estruturais, em ordem, e, para cada
+        # abertura, o índice (em tokens) do fechamento correspondente
+        self.tokens: list[int]
+        self.pair: list[int]
+        build = structure_numpy if np is not None else structure_regex
+        self.tokens, self.pair = build(src, self.reader)
+
+    def ws(self, pos: int) -> int:
+        return WS(self.src, pos).end()  # type: ignore
+
+    # Índice em tokens do contêiner que começa na posição pos
+    def token_at(self, pos: int) -> int:
+        i = bisect_left(self.tokens, pos)
+        if i == len(self.tokens) or self.tokens[i] != pos:
+            raise TypeError(f"o valor na posição {pos} não é um array nem um objeto")
+        return i
+
+    def children(self, i: int) -> list[int]:
+        """
+        Posições logo após a abertura e após cada vírgula ou dois-pontos
+        diretos do contêiner i. Subárvores internas são puladas de uma vez.
+        """
+        tokens, src, pair = self.tokens, self.src, self.pair
+        close = pair[i]
+        starts = [tokens[i] + 1]
+        j = i + 1
+        while j < close:
+            pos = tokens[j]
+            c = src[pos]
+            if c == "[" or c == "{":
+                j = pair[j] + 1
+                continue
+            starts.append(pos + 1)
+            j += 1
+        if len(starts) == 1 and self.ws(starts[0]) == tokens[close]:
+            return []  # Contêiner vazio
+        return starts
+
+    # Posição onde começa o elemento n do array que começa em pos
+    def array_item(self, pos: int, n: int) -> int:
+        if self.src[pos] != "[":
+            raise TypeError(f"o valor na posição {pos} não é um array")
+        items = self.children(self.token_at(pos))
+        return self.ws(items[n])  # IndexError se não existir
+
+    # Posição onde começa o valor da chave key no objeto que começa em pos
+    def object_value(self, pos: int, key: str) -> int:
+        if self.src[pos] != "{":
+            raise TypeError(f"o valor na posição {pos} não é um objeto")
+        starts = self.children(self.token_at(pos))
+        # Alternam: início de uma chave, início do valor correspondente
+        for key_start, value_start in zip(starts[::2], starts[1::2]):
+            name, _ = self.reader.read_string(self.ws(key_start))
+            if name == key:
+                return self.ws(value_start)
+        raise KeyError(key)
+
+    def locate(self, path: str) -> int:
+        """Posição no documento onde começa o valor indicado pelo caminho."""
+        if not path.startswith("$"):
+            raise ValueError(f"caminho deve começar com '$': {path!r}")
+        pos = self.ws(0)
+        i = 1
+        while i < len(path):
+            m = PATH_STEP.match(path, i)
+            if m is None:
+                raise ValueError(f"caminho inválido na posição {i}: {path!r}")
+            name, index, quoted = m.groups()
+            if index is not None:
+                pos = self.array_item(pos, int(index))
+            else:
+                # Chaves entre aspas podem ter escapes, como strings JSON
+                key = name if name is not None else Reader(f'"{quoted}"').read_string(0)[0]
+                pos = self.object_value(pos, key)
+            i = m.end()
+        return pos
+
+    def query(self, path: str) -> Any:
+        """Lê só o valor indicado pelo caminho."""
+        value, _ = self.reader.read_value(self.locate(path))
+        return value
+
+
+def structure_regex(src: str, reader: Reader) -> tuple[list[int], list[int]]:
+    tokens = [m.start(1) for m in STRUCTURE.finditer(src) if m.start(1) != -1]
+    pair = [-1] * len(tokens)
+    stack: list[int] = []
+    for i, pos in enumerate(tokens):
+        c = src[pos]
+        if c in OPEN:
+            stack.append(i)
+        elif c == "]" or c == "}":
+            if not stack or OPEN[src[tokens[stack[-1]]]] != c:
+                reader.error(f"{c!r} sem abertura correspondente", pos)
+            pair[stack.pop()] = i
+    if stack:
+        reader.error("contêiner não fechado", tokens[stack[-1]])
+    return tokens, pair
+
+
+def structure_numpy(src: str, reader: Reader) -> tuple[list[int], list[int]]:
+    # Um elemento por caractere, para que os índices sejam posições em src
+    if src.isascii():
+        chars = np.frombuffer(src.encode("ascii"), dtype=np.uint8)
+    else:
+        chars = np.frombuffer(src.encode("utf-32-le"), dtype=np.uint32)
+
+    # Aspas que delimitam strings: as precedidas por um número ímpar de
+    # barras invertidas estão escapadas. Escapes são raros, então as aspas
+    # depois de uma barra são verificadas uma a uma.
+    quotes = np.flatnonzero(chars == ord('"'))
+    after_backslash = quotes[(quotes > 0) & (chars[quotes - 1] == ord("\\"))]
+    escaped = []
+    for q in after_backslash.tolist():
+        i = q
+        while src[i - 1] == "\\":
+            i -= 1
+        if (q - i) % 2:
+            escaped.append(q)
+    is_quote = np.zeros(len(chars) + 1, dtype=np.int8)
+    is_quote[quotes] = 1
+    is_quote[escaped] = 0
+
+    # Um caractere está dentro de uma string se houver um número ímpar de
+    # aspas antes dele (contando a de abertura)
+    inside = np.cumsum(is_quote[:-1], dtype=np.int64) & 1
+    structural = np.isin(chars, np.frombuffer(b"[]{},:", dtype=np.uint8).astype(chars.dtype)) & (inside == 0)
+    tokens = np.flatnonzero(structural)
+
+    # Pareamento: a profundidade de cada abertura (depois dela) é igual à de
+    # seu fechamento (antes dele); ordenando os colchetes por profundidade e
+    # posição, cada abertura fica logo antes do seu fechamento
+    kinds = chars[tokens]
+    opens = (kinds == ord("[")) | (kinds == ord("{"))
+    closes = (kinds == ord("]")) | (kinds == ord("}"))
+    brackets = np.flatnonzero(opens | closes)
+    step = np.where(opens[brackets], 1, -1)
+    depth = np.cumsum(step)
+    if len(depth) and (depth.min() < 0 or depth[-1] != 0):
+        reader.error("colchetes ou chaves desbalanceados", int(tokens[brackets[-1]]))
+    depth[step == -1] += 1
+    order = brackets[np.lexsort((brackets, depth))]
+    first, second = order[0::2], order[1::2]
+    # O fechamento precisa ser do mesmo tipo da abertura ("[" = "]" - 2)
+    bad = ~opens[first] | (kinds[second] - kinds[first] != 2)
+    if bad.any():
+        reader.error("colchetes ou chaves trocados", int(tokens[second[np.argmax(bad)]]))
+
+    pair = np.full(len(tokens), -1, dtype=np.int64)
+    pair[first] = second
+    return tokens.tolist(), pair.tolist()
+
+
+def query_json(src: str, path: str) -> Any:
+    return JsonIndex(src).query(path)
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    from my_json import read_json
+
+    src = '{"items": [{"name": "a"}, {"name": "b [,]"}, {}, {"name": "d", "tags": [1, 2]}], "chave x": {"y\\"": null}}'
+    index = JsonIndex(src)
+    print(index.query("$.items[1].name"))         # Saída: b [,]
+    print(index.query("$.items[3].tags[-1]"))     # Saída: 2
+    print(index.query('$["chave x"]["y\\""]'))    # Saída: None
+    print(index.query("$.items[2]"))              # Saída: {}
+
+    # Leitura seletiva de um documento grande: índice + consulta contra a
+    # leitura completa
+    big = json.dumps({"items": [{"id": i, "name": f"aluno {i}", "notas": [i % 10] * 5} for i in range(200_000)]})
+    t0 = time.perf_counter()
+    expected = read_json(big)["items"][150_000]["name"]
+    t1 = time.perf_counter()
+    index = JsonIndex(big)
+    t2 = time.perf_counter()
+    found = index.query("$.items[150000].name")
+    t3 = time.perf_counter()
+    assert found == expected
+    print(f"read_json: {t1 - t0:.3f}s, índice: {t2 - t1:.3f}s, consulta: {t3 - t2:.3f}s")
@@ -0,0 +1,453 @@
+"""
+Leitores de JSON especializados para um formato conhecido.
+
+Quando o formato do documento é conhecido de antemão (uma dataclass, ou tipos
+simples como list[int], dict[str, float] e X | None), compile_decoder gera o
+código-fonte de funções de leitura específicas para ele, compila com exec e
+guarda o resultado em cache. Para cada dataclass, o leitor gerado:
+
+* espera as chaves na ordem em que os campos foram declarados, conferindo
+  cada uma (com a vírgula e os dois-pontos em volta) com uma única expressão
+  regular pré-compilada;
+* lê cada campo diretamente com o leitor do tipo dele, sem passar pelo
+  despacho genérico do Reader.read_value;
+* constrói o objeto chamando a classe com os valores, sem dicionário
+  intermediário.
+
+Se as chaves vierem em outra ordem, faltarem ou houver chaves desconhecidas,
+o objeto é relido por um caminho genérico mais lento, que pula os valores
+desconhecidos sem construí-los e usa os valores padrão dos campos.
+
+    @dataclass
+    class Ponto:
+        x: float
+        y: float
+        nome: str | None = None
+
+    decode = compile_decoder(list[Ponto])
+    pontos = decode('[{"x": 1, "y": 2.5}, {"y": 0, "x": 3, "cor": "azul"}]')
+
+JSON malformado gera SyntaxError, como no my_json; valores de um tipo
+diferente do esperado geram ValueError.
+"""
+import dataclasses
+import functools
+import re
+import types
+import typing
+from typing import Any, Callable
+
+from my_json import NUMBER, WS, Reader
+
+Decoder = Callable[[str, int], tuple[Any, int]]
+
+WS_RE = r"[ \t\n\r]*"
+STRING_RE = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+COMMA = re.compile(rf"{WS_RE},{WS_RE}").match
+CLOSE_OBJECT = re.compile(rf"{WS_RE}\}}").match
+CLOSE_ARRAY = re.compile(rf"{WS_RE}\]").match
+# Strings inteiras (para serem puladas) ou um colchete/chave
+SKIP_TOKEN = re.compile(rf"{STRING_RE}|[\[\]{{}}]")
+STRING = re.compile(STRING_RE).match
+
+
+def schema_error(expected: str, pos: int):
+    raise ValueError(f"esperava {expected} na posição {pos}")
+
+
+# Leitores dos tipos simples. Todos recebem o documento e a posição onde o
+# valor começa e retornam o valor e a posição logo depois dele, como os
+# métodos do Reader.
+def read_int(src: str, pos: int) -> tuple[int, int]:
+    m = NUMBER(src, pos)
+    if m is None or m.group(1) or m.group(2):
+        schema_error("um inteiro", pos)
+    return int(m.group()), m.end()  # type: ignore
+
+
+def read_float(src: str, pos: int) -> tuple[float, int]:
+    m = NUMBER(src, pos)
+    if m is None:
+        schema_error("um número", pos)
+    return float(m.group()), m.end()  # type: ignore
+
+
+def read_str(src: str, pos: int) -> tuple[str, int]:
+    if src[pos : pos + 1] != '"':
+        schema_error("uma string", pos)
+    # Caminho rápido: string sem escapes é só uma fatia da entrada
+    end = src.find('"', pos + 1)
+    if end != -1 and src.find("\\", pos + 1, end) == -1:
+        return src[pos + 1 : end], end + 1
+    return Reader(src).read_string(pos)
+
+
+def read_bool(src: str, pos: int) -> tuple[bool, int]:
+    if src.startswith("true", pos):
+        return True, pos + 4
+    if src.startswith("false", pos):
+        return False, pos + 5
+    schema_error("true ou false", pos)
+    return False, pos  # Inalcançável
+
+
+def read_none(src: str, pos: int) -> tuple[None, int]:
+    if not src.startswith("null", pos):
+        schema_error("null", pos)
+    return None, pos + 4
+
+
+def read_any(src: str, pos: int) -> tuple[Any, int]:
+    return Reader(src).read_value(pos)
+
+
+# Lê uma chave de objeto e os dois-pontos depois dela; retorna a chave e a
+# posição onde o valor começa
+def read_key(src: str, pos: int) -> tuple[str, int]:
+    if src[pos : pos + 1] != '"':
+        Reader(src).error("esperava uma chave entre aspas", pos)
+    key, pos = read_str(src, pos)
+    pos = WS(src, pos).end()  # type: ignore
+    if src[pos : pos + 1] != ":":
+        Reader(src).error("esperava ':'", pos)
+    return key, WS(src, pos + 1).end()  # type: ignore
+
+
+# Pula um valor sem construí-lo: strings e contêineres são atravessados com
+# expressões regulares, contando só a profundidade de colchetes e chaves
+def skip_value(src: str, pos: int) -> int:
+    c = src[pos : pos + 1]
+    if c == '"':
+        m = STRING(src, pos)
+        if m is None:
+            Reader(src).error("string não terminada", pos)
+        return m.end()  # type: ignore
+    if c != "[" and c != "{":
+        return Reader(src).read_value(pos)[1]  # Número ou literal
+    depth = 0
+    for m in SKIP_TOKEN.finditer(src, pos):
+        t = m.group()
+        if t == "[" or t == "{":
+            depth += 1
+        elif t == "]" or t == "}":
+            depth -= 1
+            if depth == 0:
+                return m.end()
+    Reader(src).error("contêiner não fechado", pos)
+    return pos  # Inalcançável
+
+
+# Caminho genérico das dataclasses: chaves em qualquer ordem, chaves
+# desconhecidas e campos ausentes com valor padrão
+def read_fields(src: str, pos: int, cls: type, index: dict[str, int], readers: list[Decoder]) -> tuple[Any, int]:
+    if src[pos : pos + 1] != "{":
+        schema_error(f"um objeto {cls.__name__}", pos)
+    values: list[Any] = [dataclasses.MISSING] * len(readers)
+    pos = WS(src, pos + 1).end()  # type: ignore
+    if src[pos : pos + 1] == "}":
+        pos += 1
+    else:
+        while True:
+            key, pos = read_key(src, pos)
+            i = index.get(key)
+            if i is None:
+                pos = skip_value(src, pos)
+            else:
+                values[i], pos = readers[i](src, pos)
+            pos = WS(src, pos).end()  # type: ignore
+            c = src[pos : pos + 1]
+            pos = WS(src, pos + 1).end()  # type: ignore
+            if c == "}":
+                break
+            if c != ",":
+                Reader(src).error("esperava ',' ou '}'", pos - 1)
+
+    fields = [f for f in dataclasses.fields(cls) if f.init]
+    for i, field in enumerate(fields):
+        if values[i] is dataclasses.MISSING:
+            if field.default is not dataclasses.MISSING:
+                values[i] = field.default
+            elif field.default_factory is not dataclasses.MISSING:
+                values[i] = field.default_factory()
+            else:
+                raise ValueError(f"campo obrigatório {field.name!r} ausente em {cls.__name__} na posição {pos}")
+    return cls(*values), pos
+
+
+# Conteúdo de uma string JSON (sem as aspas) com os escapes resolvidos
+def unescape(text: str) -> str:
+    return Reader(f'"{text}"').read_string(0)[0]
+
+
+# Tipos cujo valor é capturado diretamente pela expressão regular das chaves:
+# padrão do valor e conversão do texto capturado
+INLINE: dict[Any, tuple[str, str]] = {
+    int: (r"(-?(?:0|[1-9][0-9]*))(?![.eE0-9])", "int({0})"),
+    float: (r"(-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)", "float({0})"),
+    str: (r'"([^"\\\x00-\x1f]*(?:\\.[^"\\\x00-\x1f]*)*)"', '{0} if "\\\\" not in {0} else unescape({0})'),
+    bool: (r"(true|false)", '{} == "true"'),
+}
+
+SIMPLE_READERS: dict[Any, Decoder] = {
+    int: read_int,
+    float: read_float,
+    str: read_str,
+    bool: read_bool,
+    type(None): read_none,
+    None: read_none,
+    Any: read_any,
+    object: read_any,
+}
+
+
+class DecoderBuilder:
+    """
+    Gera o código-fonte das funções de leitura de um esquema. Cada tipo
+    composto (dataclass, lista, dicionário, opcional) vira uma função read_N;
+    tipos repetidos reaproveitam a mesma função, o que também permite
+    dataclasses recursivas.
+    """
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.names: dict[Any, str] = {}
+        # Listas de leitores dos campos de cada dataclass, para o caminho
+        # genérico, e os nomes das funções que vão preenchê-las depois do exec
+        self.pending: list[tuple[list, list[str]]] = []
+        self.namespace: dict[str, Any] = {
+            "WS": WS,
+            "COMMA": COMMA,
+            "CLOSE_OBJECT": CLOSE_OBJECT,
+            "CLOSE_ARRAY": CLOSE_ARRAY,
+            "Reader": Reader,
+            "read_key": read_key,
+            "read_fields": read_fields,
+            "unescape": unescape,
+            "schema_error": schema_error,
+        }
+
+    # Nome (no namespace do código gerado) do leitor do tipo
+    def reader(self, tp: Any) -> str:
+        if tp in SIMPLE_READERS:
+            name = SIMPLE_READERS[tp].__name__
+            self.namespace[name] = SIMPLE_READERS[tp]
+            return name
+        if tp in self.names:
+            return self.names[tp]
+
+        name = self.names[tp] = f"read_{len(self.names)}"
+        origin, args = typing.get_origin(tp), typing.get_args(tp)
+        if dataclasses.is_dataclass(tp) and isinstance(tp, type):
+            self.dataclass_reader(name, tp)
+        elif origin is list:
+            self.list_reader(name, args[0] if args else Any)
+        elif origin is dict:
+            if args and args[0] is not str:
+                raise TypeError(f"chaves de objetos JSON são strings, não {args[0]!r}")
+            self.dict_reader(name, args[1] if args else Any)
+        elif origin in (typing.Union, types.UnionType) and type(None) in args:
+            others = [a for a in args if a is not type(None)]
+            if len(others) != 1:
+                raise TypeError(f"uniões só são aceitas na forma X | None: {tp!r}")
+            self.optional_reader(name, others[0])
+        elif tp is list or tp is dict:
+            return self.reader(tp[Any])
+        else:
+            raise TypeError(f"tipo não suportado no esquema: {tp!r}")
+        return name
+
+    def emit(self, *lines: str):
+        self.lines.extend(lines)
+        self.lines.append("")
+
+    def constant(self, prefix: str, value: Any) -> str:
+        name = f"{prefix}_{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def dataclass_reader(self, name: str, cls: type):
+        fields = [f for f in dataclasses.fields(cls) if f.init]
+        hints = typing.get_type_hints(cls)
+        readers = [self.reader(hints[f.name]) for f in fields]
+        cls_name = self.constant("cls", cls)
+        index = self.constant("index", {f.name: i for i, f in enumerate(fields)})
+        field_readers: list[Decoder] = []
+        readers_name = self.constant("readers", field_readers)
+        self.pending.append((field_readers, readers))
+
+        lines = [
+            f"def {name}(src, pos):",
+            f"    # {cls.__name__}: chaves esperadas na ordem {', '.join(f.name for f in fields) or '(nenhuma)'}",
+        ]
+        fallback = f"        return read_fields(src, pos, {cls_name}, {index}, {readers_name})"
+
+        # Campos escalares consecutivos são conferidos e capturados por uma
+        # única expressão regular, que termina na chave do próximo campo
+        # composto (lido pelo seu próprio leitor) ou no fechamento do objeto
+        def match(pattern: str, captured: list[tuple[int, str]], p: str):
+            matcher = self.constant("fields", re.compile(pattern).match)
+            lines.extend([f"    m = {matcher}(src, {p})", "    if m is None:", fallback])
+            if captured:
+                lines.append("    g = m.groups()")
+            for k, (i, convert) in enumerate(captured):
+                lines.append(f"    v{i} = {convert.format(f'g[{k}]')}")
+
+        pattern = ""
+        captured: list[tuple[int, str]] = []
+        p = "pos"
+        for i, (field, reader) in enumerate(zip(fields, readers)):
+            sep = r"\{" if i == 0 else ","
+            key = re.escape(f'"{field.name}"')
+            pattern += rf"{WS_RE}{sep}{WS_RE}{key}{WS_RE}:{WS_RE}"
+            tp = hints[field.name]
+            if tp in INLINE:
+                value_re, convert = INLINE[tp]
+                pattern += value_re
+                captured.append((i, convert))
+            else:
+                match(pattern, captured, p)
+                lines.append(f"    v{i}, p = {reader}(src, m.end())")
+                pattern, captured, p = "", [], "p"
+        pattern += rf"{WS_RE}\}}" if fields else rf"{WS_RE}\{{{WS_RE}\}}"
+        match(pattern, captured, p)
+
+        args = ", ".join(f"v{i}" for i in range(len(fields)))
+        lines.append(f"    return {cls_name}({args}), m.end()")
+        self.emit(*lines)
+
+    def list_reader(self, name: str, item: Any):
+        reader = self.reader(item)
+        self.emit(
+            f"def {name}(src, pos):",
+            '    if src[pos : pos + 1] != "[":',
+            '        schema_error("um array", pos)',
+            "    items = []",
+            "    m = CLOSE_ARRAY(src, pos + 1)",
+            "    if m is not None:",
+            "        return items, m.end()",
+            "    append = items.append",
+            "    pos = WS(src, pos + 1).end()",
+            "    while True:",
+            f"        item, pos = {reader}(src, pos)",
+            "        append(item)",
+            "        m = COMMA(src, pos)",
+            "        if m is None:",
+            "            m = CLOSE_ARRAY(src, pos)",
+            "            if m is None:",
+            "                Reader(src).error(\"esperava ',' ou ']'\", pos)",
+            "            return items, m.end()",
+            "        pos = m.end()",
+        )
+
+    def dict_reader(self, name: str, value: Any):
+        reader = self.reader(value)
+        self.emit(
+            f"def {name}(src, pos):",
+            '    if src[pos : pos + 1] != "{":',
+            '        schema_error("um objeto", pos)',
+            "    obj = {}",
+            "    m = CLOSE_OBJECT(src, pos + 1)",
+            "    if m is not None:",
+            "        return obj, m.end()",
+            "    pos = WS(src, pos + 1).end()",
+            "    while True:",
+            "        key, pos = read_key(src, pos)",
+            f"        obj[key], pos = {reader}(src, pos)",
+            "        m = COMMA(src, pos)",
+            "        if m is None:",
+            "            m = CLOSE_OBJECT(src, pos)",
+            "            if m is None:",
+            "                Reader(src).error(\"esperava ',' ou '}'\", pos)",
+            "            return obj, m.end()",
+            "        pos = m.end()",
+        )
+
+    def optional_reader(self, name: str, tp: Any):
+        reader = self.reader(tp)
+        self.emit(
+            f"def {name}(src, pos):",
+            '    if src.startswith("null", pos):',
+            "        return None, pos + 4",
+            f"    return {reader}(src, pos)",
+        )
+
+    def build(self, schema: Any) -> tuple[Decoder, str]:
+        name = self.reader(schema)
+        source = "\n".join(self.lines)
+        code = compile(source, f"<decoder {schema!r}>", "exec")
+        exec(code, self.namespace)
+        for field_readers, names in self.pending:
+            field_readers[:] = [self.namespace[n] for n in names]
+        return self.namespace[name], source
+
+
+@functools.lru_cache(maxsize=None)
+def compile_schema(schema: Any) -> tuple[Decoder, str]:
+    """Leitor gerado para o esquema e o código-fonte dele (em cache)."""
+    return DecoderBuilder().build(schema)
+
+
+def compile_decoder(schema: Any) -> Callable[[str], Any]:
+    """Função que lê um documento JSON inteiro no formato do esquema."""
+    reader, _ = compile_schema(schema)
+
+    def decode(src: str) -> Any:
+        value, pos = reader(src, WS(src, 0).end())  # type: ignore
+        if WS(src, pos).end() != len(src):  # type: ignore
+            Reader(src).error("conteúdo após o fim do documento", pos)
+        return value
+
+    return decode
+
+
+def decoder_source(schema: Any) -> str:
+    """Código-fonte gerado para o esquema, para inspeção."""
+    return compile_schema(schema)[1]
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    from my_json import read_json
+
+    @dataclasses.dataclass
+    class Endereco:
+        cidade: str
+        uf: str
+
+    @dataclasses.dataclass
+    class Aluno:
+        id: int
+        nome: str
+        nota: float
+        ativo: bool
+        tags: list[str]
+        endereco: Endereco | None = None
+
+    print(decoder_source(list[Aluno]))
+
+    decode = compile_decoder(list[Aluno])
+    print(decode('[{"id": 1, "nome": "Fabio", "nota": 9.5, "ativo": true, "tags": ["a"], "endereco": null}]'))
+    # Fora de ordem, com chave desconhecida e campo opcional ausente
+    print(decode('[{"nome": "Ana", "extra": {"x": [1, "]"]}, "id": 2, "nota": 7, "ativo": false, "tags": []}]'))
+
+    # Leitura de muitas mensagens no formato fixo: leitor gerado contra o
+    # read_json seguido da construção dos objetos
+    def from_dict(d: dict) -> Aluno:
+        endereco = Endereco(**d["endereco"]) if d["endereco"] is not None else None
+        return Aluno(d["id"], d["nome"], d["nota"], d["ativo"], d["tags"], endereco)
+
+    messages = [
+        json.dumps({"id": i, "nome": f"aluno {i}", "nota": i % 10 + 0.5, "ativo": i % 2 == 0,
+                    "tags": ["a", "b"], "endereco": {"cidade": "Brasília", "uf": "DF"}})
+        for i in range(20_000)
+    ]
+    decode_one = compile_decoder(Aluno)
+    assert [decode_one(m) for m in messages] == [from_dict(read_json(m)) for m in messages]
+    for label, fn in [("read_json + construção", lambda m: from_dict(read_json(m))), ("leitor gerado", decode_one)]:
+        t0 = time.perf_counter()
+        for m in messages:
+            fn(m)
+        elapsed = time.perf_counter() - t0
+        print(f"{label}: {elapsed / len(messages) * 1e6:.1f} µs por mensagem")
@@ -0,0 +1,352 @@
+"""
+Leitura incremental (streaming) de JSON.
+
+O documento chega em pedaços (de um arquivo, socket, etc.) e é transformado em
+uma sequência de eventos, sem nunca precisar estar inteiro na memória. Cada
+evento é uma tupla (prefixo, evento, valor):
+
+    start_object / end_object    início e fim de um objeto
+    start_array / end_array      início e fim de um array
+    key                          chave de objeto (valor = a chave)
+    value                        string, número, true, false ou null
+
+O prefixo indica onde o evento ocorre, como no ijson: "" é a raiz, "item" são
+os elementos de um array e as chaves de objetos são separadas por pontos.
+Ex.: em {"dados": [{"x": 1}]} o 1 tem prefixo "dados.item.x".
+
+    for registro in items(iter_chunks(open("enorme.json", "rb")), "item"):
+        ...  # cada elemento do array da raiz, assim que estiver completo
+
+Os escalares são lidos com os mesmos métodos do my_json.Reader; o estado
+entre um pedaço e outro (pilha de objetos/arrays e o que se espera a seguir)
+fica no EventParser.
+"""
+import codecs
+import re
+from typing import Any, IO, Iterable, Iterator
+
+from my_json import NUMBER, WS, Reader
+
+Event = tuple[str, str, Any]
+
+# Estados do que se espera a seguir dentro de cada array ou objeto
+FIRST = "first"  # primeiro elemento ou fechamento imediato
+VALUE = "value"  # um valor
+KEY = "key"      # uma chave
+COLON = "colon"  # o ":" depois da chave
+SEP = "sep"      # "," ou fechamento
+
+NUMBER_CHARS = re.compile(r"[-+.eE0-9]*").match
+NUMBER_END = re.compile(r"[^-+.eE0-9]").search
+LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+# Chaves distintas guardadas para reaproveitamento; acima disso (chaves que
+# nunca se repetem, como ids) o cache só ocuparia memória
+MAX_KEYS = 10_000
+
+
+def child_prefix(prefix: str, name: str) -> str:
+    return f"{prefix}.{name}" if prefix else name
+
+
+class EventParser:
+    """
+    Parser "push": cada chamada a feed() recebe um pedaço do documento e
+    retorna os eventos que já puderam ser produzidos; close() indica o fim da
+    entrada. Aceita pedaços str ou bytes (decodificados como UTF-8, inclusive
+    caracteres divididos entre dois pedaços).
+    """
+
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0      # Posição atual dentro de buf
+        self.offset = 0   # Quantos caracteres já foram descartados de buf
+        self.reader = Reader("")
+        self.decoder = codecs.getincrementaldecoder("utf8")()
+        # Pilha de contêineres abertos: [tipo, estado, prefixo, prefixo dos filhos]
+        self.stack: list[list] = []
+        self.done = False  # O valor da raiz já foi lido por completo
+        # Pedaços recebidos enquanto o último token de buf não pode terminar,
+        # guardados sem juntar ao buffer: um token longo (uma string de
+        # vários MB) é copiado uma vez só, quando o pedaço que o termina chega
+        self.parts: list[str] = []
+        self.waiting = None  # Testa se um pedaço pode terminar o token, ou None
+        self.escaped = False  # A string pendente termina no meio de um escape
+
+    def feed(self, chunk: str | bytes) -> list[Event]:
+        if isinstance(chunk, bytes):
+            chunk = self.decoder.decode(chunk)
+        if self.waiting is not None and not self.waiting(chunk):
+            self.parts.append(chunk)
+            return []
+        # Descarta o que já foi consumido antes de juntar o novo pedaço, para
+        # que o buffer guarde no máximo um token incompleto mais o pedaço novo
+        self.offset += self.pos
+        self.buf = "".join([self.buf[self.pos :], *self.parts, chunk])
+        self.parts = []
+        self.pos = 0
+        events = self.parse(final=False)
+        self.wait(self.buf, self.pos)
+        return events
+
+    def close(self) -> list[Event]:
+        self.waiting = None  # Junta os pedaços pendentes
+        events = self.feed(self.decoder.decode(b"", final=True))
+        events += self.parse(final=True)
+        if self.stack or not self.done:
+            self.error("fim inesperado do documento", len(self.buf))
+        return events
+
+    def error(self, msg: str, pos: int):
+        raise SyntaxError(f"{msg} na posição {self.offset + pos}")
+
+    def parse(self, final: bool) -> list[Event]:
+        buf = self.buf
+        self.reader.src = buf
+        stack = self.stack
+        keys = self.reader.keys
+        intern = keys.setdefault
+        events: list[Event] = []
+        emit = events.append
+        pos = self.pos
+
+        while True:
+            pos = WS(buf, pos).end()  # type: ignore
+            if pos >= len(buf):
+                break
+            c = buf[pos]
+
+            if stack:
+                top = stack[-1]
+                kind, state = top[0], top[1]
+            elif self.done:
+                self.error("conteúdo após o fim do documento", pos)
+            else:
+                top, kind, state = None, None, VALUE
+
+            # Fechamento de array/objeto
+            if (c == "]" and kind == "array" and state in (FIRST, SEP)) or (
+                c == "}" and kind == "object" and state in (FIRST, SEP)
+            ):
+                stack.pop()
+                emit((top[2], "end_array" if c == "]" else "end_object", None))  # type: ignore
+                pos += 1
+                self.after_value()
+
+            elif state == SEP:
+                if c != ",":
+                    self.error(f"esperava ',' ou {']' if kind == 'array' else '}'!r}", pos)
+                top[1] = VALUE if kind == "array" else KEY  # type: ignore
+                pos += 1
+
+            elif state == COLON:
+                if c != ":":
+                    self.error("esperava ':'", pos)
+                top[1] = VALUE  # type: ignore
+                pos += 1
+
+            elif kind == "object" and state != VALUE:  # Espera uma chave
+                if c != '"':
+                    self.error("esperava uma chave entre aspas", pos)
+                if not self.has_string_end(buf, pos):
+                    if final:
+                        self.error("string não terminada", pos)
+                    break
+                key, pos = self.reader.read_string(pos)
+                key = intern(key, key) if len(keys) < MAX_KEYS else keys.get(key, key)
+                emit((top[2], "key", key))  # type: ignore
+                top[3] = child_prefix(top[2], key)  # type: ignore
+                top[1] = COLON  # type: ignore
+
+            else:  # Espera um valor
+                prefix = top[3] if top is not None else ""
+                if c == "[" or c == "{":
+                    is_array = c == "["
+                    emit((prefix, "start_array" if is_array else "start_object", None))
+                    if top is not None:
+                        top[1] = SEP  # Quando o contêiner fechar, vem "," ou o fim
+                    stack.append(
+                        ["array", FIRST, prefix, child_prefix(prefix, "item")]
+                        if is_array
+                        else ["object", FIRST, prefix, prefix]
+                    )
+                    pos += 1
+                    continue
+
+                result = self.read_scalar(buf, pos, final)
+                if result is None:
+                    break  # Token incompleto: espera o próximo pedaço
+                value, pos = result
+                emit((prefix, "value", value))
+                self.after_value()
+
+        self.pos = pos
+        return events
+
+    # Depois de um valor completo, o contêiner atual espera "," ou o fim
+    def after_value(self):
+        if self.stack:
+            self.stack[-1][1] = SEP
+        else:
+            self.done = True
+
+    # Verifica se a string que começa em pos termina dentro do buffer
+    def has_string_end(self, buf: str, pos: int) -> bool:
+        return find_quote(buf, pos + 1, False)
+
+    # Depois de parse: se buf termina com um token incompleto em pos, decide
+    # o que um pedaço novo precisa conter para que valha a pena juntá-lo
+    def wait(self, buf: str, pos: int):
+        self.waiting = None
+        if pos >= len(buf):
+            return
+        if buf[pos] == '"':
+            # Barras no fim da string pendente escapam o início do pedaço
+            tail = len(buf) - len(buf.rstrip("\\"))
+            self.escaped = tail % 2 == 1
+            self.waiting = self.string_may_end
+        elif buf[pos] not in LITERALS:
+            self.waiting = NUMBER_END
+
+    def string_may_end(self, chunk: str) -> bool:
+        if find_quote(chunk, 0, self.escaped):
+            return True
+        tail = len(chunk) - len(chunk.rstrip("\\"))
+        self.escaped = (self.escaped + tail) % 2 == 1 if tail == len(chunk) else tail % 2 == 1
+        return False
+
+    # Lê um escalar em pos. Retorna None se ele pode continuar no próximo pedaço.
+    def read_scalar(self, buf: str, pos: int, final: bool) -> tuple[Any, int] | None:
+        c = buf[pos]
+        reader = self.reader
+        if c == '"':
+            if not self.has_string_end(buf, pos):
+                if final:
+                    self.error("string não terminada", pos)
+                return None
+            return reader.read_string(pos)
+
+        if c in LITERALS:
+            lit, value = LITERALS[c]
+            if not final and len(buf) - pos < len(lit) and lit.startswith(buf[pos:]):
+                return None
+            return reader.read_literal(lit, value, pos)
+
+        # Um número que vai até o fim do buffer pode continuar no próximo
+        # pedaço, mesmo que o trecho atual já seja válido ("9." antes de "5")
+        if not final and NUMBER_CHARS(buf, pos).end() == len(buf):  # type: ignore
+            return None
+        m = NUMBER(buf, pos)
+        if m is None:
+            self.error(f"caractere inesperado {c!r}", pos)
+        return reader.read_number(m)  # type: ignore
+
+
+def find_quote(text: str, start: int, escaped: bool) -> bool:
+    """
+    Verifica se há aspas não escapadas em text a partir de start; escaped
+    indica que o texto anterior a start termina com uma barra que escapa
+    o primeiro caractere.
+    """
+    end = text.find('"', start)
+    while end != -1:
+        # Aspas precedidas por um número ímpar de barras estão escapadas
+        i = end
+        while i > start and text[i - 1] == "\\":
+            i -= 1
+        if (end - i + (escaped and i == start)) % 2 == 0:
+            return True
+        end = text.find('"', end + 1)
+    return False
+
+
+def iter_chunks(fp: IO, size: int = 64 * 1024) -> Iterator:
+    """Lê um arquivo (texto ou binário) em pedaços de até size unidades."""
+    while chunk := fp.read(size):
+        yield chunk
+
+
+def parse(chunks: Iterable[str | bytes]) -> Iterator[Event]:
+    """Parser "pull": produz os eventos conforme os pedaços são consumidos."""
+    parser = EventParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def items(chunks: Iterable[str | bytes], prefix: str) -> Iterator[Any]:
+    """
+    Produz cada valor completo encontrado no prefixo dado, assim que ele
+    termina. Ex.: items(pedaços, "item") entrega um a um os elementos do
+    array da raiz; só o elemento atual precisa caber na memória.
+    """
+    building: list = []  # Pilha de contêineres do valor em construção
+    keys: list = []      # Chave pendente em cada objeto em construção
+
+    for event_prefix, event, value in parse(chunks):
+        if not building:
+            if event_prefix != prefix:
+                continue
+            if event == "value":
+                yield value
+                continue
+            if event not in ("start_array", "start_object"):
+                continue
+
+        if event == "key":
+            keys[-1] = value
+            continue
+
+        if event in ("end_array", "end_object"):
+            # Contêineres aninhados já foram adicionados ao pai no início
+            value = building.pop()
+            keys.pop()
+            if not building:
+                yield value
+            continue
+        elif event in ("start_array", "start_object"):
+            container: Any = [] if event == "start_array" else {}
+            if building:
+                add(building[-1], keys[-1], container)
+            building.append(container)
+            keys.append(None)
+            continue
+
+        add(building[-1], keys[-1], value)
+
+
+# Adiciona um valor ao contêiner (lista ou dicionário) em construção
+def add(container, key, value):
+    if isinstance(container, list):
+        container.append(value)
+    else:
+        container[key] = value
+
+
+if __name__ == "__main__":
+    import json
+
+    from my_json import read_json
+
+    src = '{"nome": "Fabio", "notas": [10, 9.5, -3e2], "ok": true, "x": null, "s": "a\\"b\\\\", "u": "\\u00e9ç"}'
+
+    # Eventos do documento inteiro
+    for event in parse([src]):
+        print(event)
+
+    # O resultado precisa ser o mesmo qualquer que seja o ponto de corte
+    # entre dois pedaços, inclusive no meio de números, literais, escapes
+    # e caracteres UTF-8 de vários bytes
+    expected = list(parse([src]))
+    data = src.encode("utf8")
+    for cut in range(len(data) + 1):
+        assert list(parse([data[:cut], data[cut:]])) == expected, cut
+    assert list(parse(data[i : i + 1] for i in range(len(data)))) == expected
+    print("cortes: ok")
+
+    # Elementos de um array grande, um por vez
+    records = json.dumps({"dados": [{"id": i, "nome": f"aluno {i}"} for i in range(1000)]})
+    chunks = (records[i : i + 100] for i in range(0, len(records), 100))
+    assert list(items(chunks, "dados.item")) == read_json(records)["dados"]
+    nested = '[null, {}, [[1], 2], {"a": {"b": [3, {}]}, "c": []}, [[[1]], 2]]'
+    assert list(items([nested], "item")) == read_json(nested)
+    print("items: ok")
@@ -1,143 +1,434 @@
-from typing import Any
-
-# Função principal para interpretar uma string JSON
-def read_json(src: str) -> Any:
-    # Reverte a string em uma lista de caracteres para facilitar leitura com pop()
-    chars = list(reversed(src))
-    return read_value(chars)  # Inicia leitura do valor principal do JSON
-
-# Função que decide qual tipo de valor JSON será lido
-def read_value(chars: list[str]):
-    ws(chars)  # Remove espaços em branco antes de processar o valor
-
-    match chars[-1]:  # Analisa o próximo caractere
-        case "t":
-            # Literal "true"
-            value = read_literal("true", chars, True)
-        case "f":
-            # Literal "false"
-            value = read_literal("false", chars, False)
-        case "n":
-            # Literal "null"
-            value = read_literal("null", chars, None)
-        case "{":
-            # Objeto JSON
-            value = read_object(chars)
-        case "[":
-            # Array JSON
-            value = read_array(chars)
-        case '"':
-            # String JSON
-            value = read_string(chars)
-        case '-':
-            # Número negativo
-            chars.pop()
-            value = -read_number(chars)
-        case c if c.isdigit():
-            # Número positivo
-            value = read_number(chars)
-        case _:
-            # Qualquer outro caractere causa erro de sintaxe
-            raise SyntaxError 
-
-    ws(chars)  # Remove espaços em branco após processar o valor
-    return value
+import io
+import numbers
+import re
+from array import array
+from typing import IO, Any, Iterable
+
+# Expressões regulares pré-compiladas para consumir vários caracteres de uma
+# vez. Os métodos .match ficam em variáveis globais para acesso mais rápido.
+WS = re.compile(r"[ \t\n\r]*").match
+NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?").match
+STRING_CHUNK = re.compile(r'[^"\\\x00-\x1f]*').match
+CONTROL_CHAR = re.compile(r"[\x00-\x1f]").search  # Proibidos sem escape dentro de strings
+HEX4 = re.compile(r"[0-9a-fA-F]{4}").match
+WS_CHARS = frozenset(" \t\n\r")
+
+# Nos modos de arrays numéricos compactos, o conteúdo de um array é lido de
+# uma vez se tiver só caracteres que aparecem em números; cada elemento ainda
+# é validado com a gramática de números do JSON antes da conversão
+NUMERIC_CHARS = re.compile(r"[-+0-9.eE, \t\n\r]*").fullmatch
+NUMERIC_ITEM = re.compile(r"[ \t\n\r]*-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?[ \t\n\r]*").fullmatch
+FLOAT_CHARS = re.compile(r"[.eE]").search
+BIG_INT = re.compile(r"[0-9]{19}").search  # Pode não caber em 64 bits
+LONG_INT = re.compile(r"[0-9]{16}").search  # Pode passar de 2 ^ 53
+NUMERIC_ARRAY_MODES = (None, "array", "numpy")
 
+# Sequências de escape de um caractere dentro de strings
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
 
-# Função auxiliar para ignorar espaços em branco
-def ws(chars: list[str]):
-    while chars and chars[-1] in " \n\t\r":
-        chars.pop()
+# Caracteres que precisam de escape na escrita e a forma escapada de cada um
+NEEDS_ESCAPE = re.compile(r'["\\\x00-\x1f]')
+WRITE_ESCAPES = {c: f"\\u{ord(c):04x}" for c in map(chr, range(0x20))}
+WRITE_ESCAPES.update({'"': '\\"', "\\": "\\\\", "\b": "\\b", "\f": "\\f", "\n": "\\n", "\r": "\\r", "\t": "\\t"})
 
 
-# Verifica e consome literais como "true", "false" e "null"
-def read_literal(lit: str, chars: list[str], value):
-    for c in lit:
-        if c != chars.pop():
-            raise SyntaxError  # Se algum caractere não bater, erro
+# Função principal para interpretar uma string JSON.
+#
+# Com numeric_arrays="array", arrays não vazios formados só por números viram
+# array("q") (inteiros) ou array("d") (se algum tiver parte fracionária ou
+# expoente); com "numpy", arrays NumPy int64 ou float64. Arrays com outros
+# tipos de valor, ou com inteiros que não cabem em 64 bits, continuam listas.
+def read_json(src: str, numeric_arrays: str | None = None) -> Any:
+    reader = Reader(src, numeric_arrays)
+    pos = reader.ws(0)
+    value, pos = reader.read_value(pos)  # Inicia leitura do valor principal do JSON
+    if reader.ws(pos) != len(src):
+        reader.error("conteúdo após o fim do documento", pos)
     return value
 
 
-# Lê números inteiros simples do JSON (sem ponto flutuante)
-def read_number(chars: list[str]) -> int:
-    if chars[-1] == "0":
-        chars.pop()
-        return 0  # Trata 0 como caso especial
+# O leitor percorre a string original com um índice inteiro, sem copiá-la:
+# cada método recebe a posição onde o valor começa e retorna o valor lido e a
+# posição logo depois dele. Espaços, corpos de strings e números são
+# consumidos em bloco com expressões regulares ou str.find.
+#
+# As chaves de objetos passam por um cache de internação compartilhado por
+# toda a leitura: em arrays de registros que repetem as mesmas chaves, cada
+# chave distinta fica guardada uma única vez.
+class Reader:
+    def __init__(self, src: str, numeric_arrays: str | None = None):
+        if numeric_arrays not in NUMERIC_ARRAY_MODES:
+            raise ValueError(f"modo de arrays numéricos inválido: {numeric_arrays!r}")
+        self.src = src
+        self.keys: dict[str, str] = {}
+        self.numeric_arrays = numeric_arrays
+
+    def error(self, msg: str, pos: int):
+        raise SyntaxError(f"{msg} na posição {pos}")
+
+    # Função auxiliar para ignorar espaços em branco
+    def ws(self, pos: int) -> int:
+        return WS(self.src, pos).end()  # type: ignore
+
+    # Função que decide qual tipo de valor JSON será lido. O valor precisa
+    # começar exatamente em pos (os espaços antes dele já foram consumidos).
+    def read_value(self, pos: int) -> tuple[Any, int]:
+        src = self.src
+        match src[pos : pos + 1]:  # Analisa o próximo caractere
+            case '"':
+                # String JSON
+                return self.read_string(pos)
+            case "[":
+                # Array JSON
+                return self.read_array(pos)
+            case "{":
+                # Objeto JSON
+                return self.read_object(pos)
+            case "t":
+                # Literal "true"
+                return self.read_literal("true", True, pos)
+            case "f":
+                # Literal "false"
+                return self.read_literal("false", False, pos)
+            case "n":
+                # Literal "null"
+                return self.read_literal("null", None, pos)
+            case "":
+                self.error("fim inesperado do documento", pos)
+            case c:
+                # Números (o sinal é tratado pela própria expressão regular);
+                # qualquer outro caractere causa erro de sintaxe
+                m = NUMBER(src, pos)
+                if m is None:
+                    self.error(f"caractere inesperado {c!r}", pos)
+                return self.read_number(m)
+
+    # Verifica e consome literais como "true", "false" e "null"
+    def read_literal(self, lit: str, value, pos: int) -> tuple[Any, int]:
+        if not self.src.startswith(lit, pos):
+            self.error(f"esperava {lit!r}", pos)
+        return value, pos + len(lit)
+
+    # Converte um número já reconhecido pela expressão regular NUMBER:
+    # inteiros viram int; com parte fracionária ou expoente, float
+    def read_number(self, m: re.Match) -> tuple[int | float, int]:
+        frac, exp = m.groups()
+        if frac or exp:
+            return float(m.group()), m.end()
+        return int(m.group()), m.end()
+
+    # Lê strings JSON entre aspas duplas
+    def read_string(self, pos: int) -> tuple[str, int]:
+        src = self.src
+        start = pos + 1  # Pula as aspas de abertura
+
+        # Caminho rápido: string sem escapes é só uma fatia da entrada
+        end = src.find('"', start)
+        if end == -1:
+            self.error("string não terminada", pos)
+        if src.find("\\", start, end) == -1:
+            bad = CONTROL_CHAR(src, start, end)
+            if bad is not None:
+                self.error("caractere de controle dentro de string", bad.start())
+            return src[start:end], end + 1
+
+        # Caminho com escapes: junta os pedaços entre as barras invertidas
+        parts = []
+        pos = start
+        while True:
+            end = STRING_CHUNK(src, pos).end()  # type: ignore
+            parts.append(src[pos:end])
+            c = src[end : end + 1]
+            if c == '"':
+                break
+            if c == "":
+                self.error("string não terminada", start - 1)
+            if c != "\\":
+                self.error("caractere de controle dentro de string", end)
+
+            esc = src[end + 1 : end + 2]
+            if esc == "u":
+                char, pos = self.read_unicode_escape(end)
+                parts.append(char)
+            elif esc in ESCAPES:
+                parts.append(ESCAPES[esc])
+                pos = end + 2
+            else:
+                self.error(f"escape inválido \\{esc}", end)
+
+        return "".join(parts), end + 1
+
+    # Lê um escape \uXXXX começando em pos, juntando pares de surrogates
+    def read_unicode_escape(self, pos: int) -> tuple[str, int]:
+        src = self.src
+        # Exatamente quatro dígitos hexadecimais (int() aceitaria "+041" ou " 41 ")
+        if HEX4(src, pos + 2) is None:
+            self.error("escape \\u inválido", pos)
+        code = int(src[pos + 2 : pos + 6], 16)
+        pos += 6
+        if 0xD800 <= code < 0xDC00 and src.startswith("\\u", pos) and HEX4(src, pos + 2) is not None:
+            # Se o próximo escape não for o surrogate baixo, o caractere fica isolado
+            low = int(src[pos + 2 : pos + 6], 16)
+            if 0xDC00 <= low < 0xE000:
+                code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                pos += 6
+        return chr(code), pos
+
+    # Lê arrays JSON (listas Python)
+    def read_array(self, pos: int) -> tuple[Any, int]:
+        src = self.src
+        if self.numeric_arrays is not None:
+            end = src.find("]", pos)
+            if end != -1 and NUMERIC_CHARS(src, pos + 1, end) is not None:
+                numbers = self.read_numeric_array(src[pos + 1 : end])
+                if numbers is not None:
+                    return numbers, end + 1
+
+        read_value = self.read_value
+        values: list = []
+        append = values.append
+
+        pos = WS(src, pos + 1).end()  # type: ignore # Pula o "[" e os espaços
+        # Caso de array vazio
+        if src[pos : pos + 1] == "]":
+            return values, pos + 1
 
-    ns = []
-    while chars and chars[-1] in "0123456789":
-        n = chars.pop()
-        ns.append(n)
-    return int("".join(ns))  # Junta os dígitos e converte para int
+        while True:
+            value, pos = read_value(pos)  # Lê um valor dentro do array
+            append(value)
 
+            c = src[pos : pos + 1]
+            if c in WS_CHARS:
+                pos = WS(src, pos).end()  # type: ignore
+                c = src[pos : pos + 1]
+            pos += 1
+            if c == ",":
+                # Lê próximo valor
+                if src[pos : pos + 1] in WS_CHARS:
+                    pos = WS(src, pos).end()  # type: ignore
+            elif c == "]":
+                return values, pos  # Fim do array
+            else:
+                self.error("esperava ',' ou ']'", pos - 1)  # Qualquer outra coisa é erro
 
-# Lê strings JSON entre aspas duplas
-def read_string(chars: list[str]) -> str:
-    if chars.pop() != '"':
-        raise SyntaxError  # Erro se não começar com aspas
+    # Converte de uma vez o conteúdo de um array só de números em um array
+    # compacto. Retorna None se o conteúdo não for uma lista válida de
+    # números (o caminho normal reporta o erro) ou se algum inteiro pode não
+    # caber em 64 bits.
+    def read_numeric_array(self, text: str) -> Any:
+        items = text.split(",")
+        if not all(map(NUMERIC_ITEM, items)):
+            return None
+        is_float = FLOAT_CHARS(text) is not None
+        if is_float:
+            # Os inteiros também viram float64: acima de 2 ^ 53 perderiam precisão
+            if any(abs(int(item)) > 2**53 for item in items if LONG_INT(item) and not FLOAT_CHARS(item)):
+                return None
+        elif BIG_INT(text) is not None:
+            return None
+        if self.numeric_arrays == "numpy":
+            import numpy as np  # type: ignore
 
-    parts = []
-    while (c := chars.pop()) != '"':
-        parts.append(c)  # Coleta cada caractere da string
+            return np.array(items, dtype=np.float64 if is_float else np.int64)
+        return array("d", map(float, items)) if is_float else array("q", map(int, items))
 
-    return "".join(parts)  # Retorna a string formada
+    # Lê objetos JSON (dicionários Python)
+    def read_object(self, pos: int) -> tuple[dict, int]:
+        src = self.src
+        read_value = self.read_value
+        read_string = self.read_string
+        intern = self.keys.setdefault
+        obj: dict = {}
 
+        pos = WS(src, pos + 1).end()  # type: ignore # Pula o "{" e os espaços
+        # Caso de objeto vazio
+        if src[pos : pos + 1] == "}":
+            return obj, pos + 1
 
-# Lê arrays JSON (listas Python)
-def read_array(chars: list[str]) -> list:
-    if chars.pop() != "[":
-        raise SyntaxError  # Erro se não começar com [
+        while True:
+            # Chave: sempre uma string, reaproveitada do cache se já vista
+            if src[pos : pos + 1] != '"':
+                self.error("esperava uma chave entre aspas", pos)
+            key, pos = read_string(pos)
+            key = intern(key, key)
 
-    ws(chars)  # Ignora espaços
+            if src[pos : pos + 1] in WS_CHARS:
+                pos = WS(src, pos).end()  # type: ignore
+            if src[pos : pos + 1] != ":":
+                self.error("esperava ':'", pos)
+            pos += 1
+            if src[pos : pos + 1] in WS_CHARS:
+                pos = WS(src, pos).end()  # type: ignore
 
-    # Caso de array vazio
-    if chars[-1] == "]":
-        chars.pop()
-        return []
+            obj[key], pos = read_value(pos)
 
-    values = []
-    while True:
-        value = read_value(chars)  # Lê um valor dentro do array
-        values.append(value)
-        
-        c = chars.pop()
-        if c == ",":
-            continue  # Lê próximo valor
-        elif c == "]":
-            break  # Fim do array
+            c = src[pos : pos + 1]
+            if c in WS_CHARS:
+                pos = WS(src, pos).end()  # type: ignore
+                c = src[pos : pos + 1]
+            pos += 1
+            if c == ",":
+                # Lê o próximo par chave/valor
+                if src[pos : pos + 1] in WS_CHARS:
+                    pos = WS(src, pos).end()  # type: ignore
+            elif c == "}":
+                return obj, pos  # Fim do objeto
+            else:
+                self.error("esperava ',' ou '}'", pos - 1)
+
+
+# Função principal para escrever um valor como JSON em um arquivo (texto ou
+# binário, em UTF-8). Iteradores e geradores viram arrays e só são consumidos
+# durante a escrita, então a saída nunca precisa estar inteira na memória.
+def write_json(obj: Any, fp: IO, buffer_size: int = 64 * 1024):
+    writer = Writer(fp, buffer_size)
+    writer.write_value(obj)
+    writer.flush()
+
+
+# O escritor junta os pedaços da saída em uma lista reaproveitada e só chama
+# fp.write quando ela passa de buffer_size caracteres, evitando tanto uma
+# chamada por token quanto montar a saída inteira antes de escrever.
+class Writer:
+    def __init__(self, fp: IO, buffer_size: int = 64 * 1024):
+        self.fp = fp
+        self.binary = not isinstance(fp, io.TextIOBase) and "b" in getattr(fp, "mode", "b")
+        self.buffer_size = buffer_size
+        self.parts: list[str] = []
+        self.size = 0
+
+    def write(self, text: str):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        text = "".join(self.parts)
+        self.fp.write(text.encode("utf8") if self.binary else text)
+        self.parts.clear()
+        self.size = 0
+
+    def write_value(self, obj: Any):
+        # bool vem antes de int, pois True e False também são ints
+        if obj is None:
+            self.write("null")
+        elif obj is True:
+            self.write("true")
+        elif obj is False:
+            self.write("false")
+        elif isinstance(obj, str):
+            self.write_string(obj)
+        elif isinstance(obj, int):
+            self.write(int.__repr__(obj))
+        elif isinstance(obj, float):
+            if obj != obj or obj in (float("inf"), float("-inf")):
+                raise ValueError(f"{obj!r} não pode ser representado em JSON")
+            self.write(float.__repr__(obj))
+        elif isinstance(obj, dict):
+            self.write_object(obj)
+        elif isinstance(obj, (list, tuple)) or (isinstance(obj, Iterable) and not isinstance(obj, (bytes, bytearray))):
+            self.write_array(obj)
+        elif isinstance(obj, numbers.Integral):
+            # Inteiros de outros tipos, como os elementos de arrays NumPy
+            self.write_value(int(obj))
+        elif isinstance(obj, numbers.Real):
+            self.write_value(float(obj))
+        else:
+            raise TypeError(f"objeto do tipo {type(obj).__name__} não pode ser escrito como JSON")
+
+    # Escreve strings entre aspas duplas
+    def write_string(self, text: str):
+        # Caminho rápido: nada a escapar
+        if NEEDS_ESCAPE.search(text) is None:
+            self.write(f'"{text}"')
         else:
-            raise SyntaxError  # Qualquer outra coisa é erro
-    
-    return values
+            self.write('"' + NEEDS_ESCAPE.sub(lambda m: WRITE_ESCAPES[m.group()], text) + '"')
+
+    # Escreve listas, tuplas e qualquer outro iterável como arrays JSON
+    def write_array(self, items: Iterable):
+        write = self.write
+        write_value = self.write_value
+        write("[")
+        first = True
+        for item in items:
+            if not first:
+                write(", ")
+            first = False
+            write_value(item)
+        write("]")
 
+    # Escreve dicionários como objetos JSON; as chaves precisam ser strings
+    def write_object(self, obj: dict):
+        write = self.write
+        write_value = self.write_value
+        write("{")
+        first = True
+        for key, value in obj.items():
+            if not isinstance(key, str):
+                raise TypeError(f"chaves de objetos JSON precisam ser strings, não {type(key).__name__}")
+            if not first:
+                write(", ")
+            first = False
+            self.write_string(key)
+            write(": ")
+            write_value(value)
+        write("}")
 
-# OBS: Essa função está declarada mas não utilizada neste exemplo
-# Lê objetos JSON (dicionários), ainda a ser implementada se necessário
-def read_object(chars: list[str]):
-    raise NotImplementedError("Objetos JSON não implementados")
 
 # Bloco principal de testes
 if __name__ == "__main__":
-    import json 
-    import time
+    import json
 
     # Testes simples de leitura de tipos diferentes
     print(read_json("null"))                         # Saída: None
     print(read_json("42") + 1)                       # Saída: 43
     print(read_json('"Fabio"'))                      # Saída: Fabio
     print(read_json('[1, "Fabio", [1, 2, [[]]], "compiladores"]'))  # Saída: [1, 'Fabio', [1, 2, [[]]], 'compiladores']
+    print(read_json('{"nome": "Fabio", "notas": [10, 9.5], "ativo": true}'))  # Saída: {'nome': 'Fabio', 'notas': [10, 9.5], 'ativo': True}
+
+    # Memória usada para ler um array de registros com as mesmas chaves.
+    # Graças ao cache de chaves, cada chave é guardada uma única vez, como
+    # no json.loads.
+    import tracemalloc
+
+    records = json.dumps([{"id": i, "nome": f"aluno {i}", "nota": i % 10, "ativo": i % 2 == 0} for i in range(100_000)])
+    for name, loads in [("json.loads", json.loads), ("read_json", read_json)]:
+        tracemalloc.start()
+        parsed = loads(records)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        key_ids = {id(k) for record in parsed for k in record}
+        print(f"{name}: pico de {peak / 2**20:.1f} MiB, {len(key_ids)} objetos distintos para as chaves")
+        del parsed
+
+    # Escrita em streaming: um gerador de um milhão de registros é gravado
+    # sem que a lista inteira nem o texto inteiro existam na memória
+    import os
+
+    records_gen = ({"id": i, "nome": f"aluno {i}", "nota": i % 10} for i in range(1_000_000))
+    tracemalloc.start()
+    with open(os.devnull, "wb") as fd:
+        write_json({"registros": records_gen}, fd)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"write_json: pico de {peak / 2**20:.1f} MiB para um milhão de registros")
+
+    buffer = io.StringIO()
+    value = {"texto": 'aspas " barra \\ quebra \n e ção', "números": [1, -2.5, 1e100], "vazio": [], "x": None}
+    write_json(value, buffer)
+    assert read_json(buffer.getvalue()) == json.loads(buffer.getvalue()) == value
+    print(buffer.getvalue())
+
+    # Arrays numéricos compactos: 8 bytes por número em vez de uma lista de
+    # ponteiros para objetos int/float
+    series = json.dumps({"serie": [i * 0.5 for i in range(200_000)], "ids": list(range(200_000))})
+    for mode in NUMERIC_ARRAY_MODES:
+        tracemalloc.start()
+        parsed = read_json(series, numeric_arrays=mode)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"numeric_arrays={mode}: {type(parsed['serie']).__name__}, {retained / 2**20:.1f} MiB para o resultado")
+        del parsed
 
-    # Texto de entrada a ser testado com benchmarks
-    src = '[1, "Fabio", [1, 2, [[]]], "compiladores"]'
-    
-    # Benchmark usando o parser nativo do Python
-    t0 = time.time()
-    for _ in range(1000):
-        json.loads(src)
-    print("json.loads:", time.time() - t0)
-
-    # Benchmark usando o parser customizado
-    t0 = time.time()
-    for _ in range(1000):
-        read_json(src)
-    print("read_json:", time.time() - t0)
+    # Medições de desempenho ficam no bench.py
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""
+Leitura paralela de arquivos NDJSON (um documento JSON por linha).
+
+O arquivo é mapeado na memória com mmap e dividido em faixas de bytes que
+sempre terminam em uma quebra de linha. Cada faixa é lida e interpretada com
+read_json por um processo do pool, que abre o arquivo por conta própria e
+copia só a sua fatia; o processo principal recebe de volta os documentos (ou
+um resultado agregado por faixa) na ordem do arquivo.
+
+    for doc in load_ndjson("enorme.ndjson"):
+        ...
+
+    # Agrega dentro dos processos para não trafegar os documentos
+    total = sum(load_ndjson("enorme.ndjson", aggregate=len))
+
+A função aggregate precisa poder ser enviada a outro processo (definida no
+nível de um módulo, não uma lambda).
+
+    python3 ndjson.py enorme.ndjson --workers 8
+"""
+import mmap
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator
+
+import click  # type: ignore
+
+from my_json import read_json
+
+CHUNK_SIZE = 4 * 2**20  # Tamanho aproximado de cada faixa, em bytes
+
+
+def split_ranges(path: str, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """
+    Divide o arquivo em faixas [início, fim) de cerca de chunk_size bytes,
+    cada uma terminando logo depois de um "\\n" (ou no fim do arquivo).
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, "rb") as fd, mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end == -1 else end + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_range(path: str, start: int, end: int) -> list:
+    """Interpreta as linhas da faixa [start, end) do arquivo."""
+    with open(path, "rb") as fd, mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+
+    docs = []
+    offset = start
+    for line in data.split(b"\n"):
+        if line.strip():
+            try:
+                docs.append(read_json(line.decode("utf8")))
+            except SyntaxError as exc:
+                raise SyntaxError(f"{exc} (linha que começa no byte {offset})") from None
+        offset += len(line) + 1
+    return docs
+
+
+# Executado nos processos do pool
+def load_range(path: str, start: int, end: int, aggregate: Callable | None) -> Any:
+    docs = read_range(path, start, end)
+    return docs if aggregate is None else aggregate(docs)
+
+
+def iter_ranges(
+    path: str,
+    *,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    aggregate: Callable[[list], Any] | None = None,
+) -> Iterator[Any]:
+    """
+    Produz, na ordem do arquivo, o resultado de cada faixa: a lista de
+    documentos ou aggregate(documentos). No máximo duas faixas por processo
+    ficam em andamento ao mesmo tempo, para que resultados ainda não
+    consumidos não se acumulem na memória.
+    """
+    # Núcleos que este processo pode usar (sched_getaffinity só existe no Linux)
+    workers = workers or (len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1)
+    ranges = iter(split_ranges(path, chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for start, end in ranges:
+            pending.append(pool.submit(load_range, path, start, end, aggregate))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_ndjson(path: str, *, aggregate: Callable[[list], Any] | None = None, **options) -> Iterator[Any]:
+    """
+    Produz cada documento do arquivo, na ordem. Com aggregate, produz um
+    resultado agregado por faixa (veja iter_ranges).
+    """
+    if aggregate is not None:
+        yield from iter_ranges(path, aggregate=aggregate, **options)
+        return
+    for docs in iter_ranges(path, **options):
+        yield from docs
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", type=int, default=None, help="Processos no pool (padrão: núcleos disponíveis).")
+@click.option("--chunk-size", type=int, default=CHUNK_SIZE, show_default=True, help="Tamanho de cada faixa, em bytes.")
+def main(path, workers, chunk_size):
+    size = os.path.getsize(path)
+    t0 = time.perf_counter()
+    count = sum(load_ndjson(path, workers=workers, chunk_size=chunk_size, aggregate=len))
+    elapsed = time.perf_counter() - t0
+    print(f"{count} documentos, {size / 2**20:.1f} MiB em {elapsed:.2f}s ({size / 2**20 / elapsed:.1f} MiB/s)")
+
+
+if __name__ == "__main__":
+    main()
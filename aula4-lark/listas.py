@@ -5,7 +5,11 @@
 # de elementos x. Aqui ilustramos um uso muito simples da biblioteca Lark.
 # Veja mais em https://github.com/lark-parser/lark
 
-import lark  # type: ignore # Importa a biblioteca Lark, usada para criar parsers com gramática formal
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parser_factory import make_parser
 
 # Definição da gramática como uma string multilinha (em formato EBNF)
 grammar = r"""
@@ -40,7 +44,7 @@ epsilon :
 """
 
 # Cria um parser Lark com base na gramática definida
-parser = lark.Lark(grammar)
+parser = make_parser(grammar)
 
 # Faz o parsing da string de entrada '[x,[x,]]'
 # Essa string representa uma lista com dois elementos:
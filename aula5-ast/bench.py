@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Benchmark das formas de ler as linguagens de listas da aula 5:
+
+- arvore: parser.parse seguido de transformer.transform (árvore completa);
+- inline: parser LALR do Lark com o transformer aplicado durante a análise;
+- rapido: parse_fast, o tokenizador + parser iterativo de rapido.py.
+
+Antes de medir, confere que as três formas produzem o mesmo valor.
+
+    python3 bench.py
+    python3 bench.py --module calc --size 1000000
+"""
+import importlib
+import random
+import time
+from typing import Any, Callable
+
+import click  # type: ignore
+
+from fabrica import make_parser
+
+
+def flat(n: int, rng: random.Random, math: bool) -> str:
+    return "[" + ",".join(str(rng.randint(0, 999)) for _ in range(n)) + "]"
+
+
+def nested(n: int, rng: random.Random, math: bool) -> str:
+    # Listas pequenas aninhadas em uma lista de cerca de n números
+    items = []
+    for _ in range(n // 10):
+        inner = ",".join(str(rng.randint(0, 9)) for _ in range(rng.randint(0, 9)))
+        items.append(f"[{inner},[{rng.randint(0, 9)}]]" if inner else "[[]]")
+    return "[" + ",".join(items) + "]"
+
+
+def expressions(n: int, rng: random.Random, math: bool) -> str:
+    if not math:
+        return flat(n, rng, math)
+    ops = ["+", "-", "*"]
+    return "[" + ",".join(
+        f"{rng.randint(1, 99)} {rng.choice(ops)} {rng.randint(1, 99)} {rng.choice(ops)} {rng.randint(1, 99)}"
+        for _ in range(n // 3)
+    ) + "]"
+
+
+SHAPES = {"plana": flat, "aninhada": nested, "expressoes": expressions}
+
+
+def pipelines(module) -> dict[str, Callable[[str], Any]]:
+    inline = make_parser(module.grammar, parser="lalr", transformer=type(module.transformer)())
+    return {
+        "arvore": lambda src: module.transformer.transform(module.parser.parse(src)),
+        "inline": inline.parse,
+        "rapido": module.parse_fast,
+    }
+
+
+def best_time(parse: Callable[[str], Any], src: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parse(src)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+@click.command()
+@click.option("--module", "modules", multiple=True, type=click.Choice(["listas", "calc", "listacalc"]),
+              help="Módulos medidos (padrão: todos).")
+@click.option("--size", default=100_000, show_default=True, help="Número aproximado de números na entrada.")
+@click.option("--repeat", default=3, help="Repetições de cada medida (vale a melhor).")
+@click.option("--seed", default=0, help="Semente do gerador de entradas.")
+def main(modules, size, repeat, seed):
+    print(f"{'módulo':<10} {'formato':<11} {'pipeline':<8} {'melhor (s)':>11} {'aceleração':>11}")
+    for name in modules or ["listas", "calc", "listacalc"]:
+        module = importlib.import_module(name)
+        runs = pipelines(module)
+        for shape, make in SHAPES.items():
+            src = make(size, random.Random(seed), name != "listas")
+            results = {key: parse(src) for key, parse in runs.items()}
+            assert all(value == results["arvore"] for value in results.values()), f"{name} {shape}: resultados diferentes"
+
+            baseline = None
+            for key, parse in runs.items():
+                elapsed = best_time(parse, src, repeat)
+                baseline = baseline or elapsed
+                print(f"{name:<10} {shape:<11} {key:<8} {elapsed:>11.4f} {baseline / elapsed:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
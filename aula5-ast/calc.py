@@ -1,8 +1,10 @@
-from lark import Lark, Transformer, Tree  # type: ignore
+from lark import Transformer_NonRecursive, Tree  # type: ignore
 # Importa a biblioteca Lark:
-# - Lark: para criar o parser com base em uma gramática
-# - Transformer: para transformar a árvore sintática em estruturas Python
+# - Transformer_NonRecursive: para transformar a árvore sintática em estruturas Python
 # - Tree: representa a árvore de sintaxe gerada (não usada diretamente aqui)
+from fabrica import make_parser
+from rapido import parse_values  # Lê a lista direto para valores Python, sem árvore intermediária
+from operadores import evaluate, evaluate_array  # Tabela de operadores (sem eval) e modo vetorizado
 
 # Define a gramática EBNF (Extended Backus–Naur Form)
 grammar = r"""
@@ -14,23 +16,18 @@ grammar = r"""
 list     : "["  "]"
          | "[" items "]"
 
-# A produção 'items' define:
-# - Um único item (regra 'single')
-# - Ou um item seguido de vírgula e mais itens (forma recursiva)
-items    : item            -> single
-         | item "," items
+# A produção 'items' define uma sequência de itens separados por vírgula.
+# A repetição é plana: todos os itens são filhos do mesmo nó, em vez de uma
+# cadeia item "," items com profundidade igual ao tamanho da lista
+items    : item ("," item)*
 
-# Um 'item' pode ser:
-# - Uma expressão matemática (math)
-# - Ou uma lista (permite listas aninhadas)
+# Um 'item' é uma expressão matemática (um átomo sozinho já é uma expressão,
+# então listas aninhadas também entram por aqui)
 ?item    : math
-         | list
 
-# Uma expressão matemática pode ser:
-# - Um átomo seguido de um operador e outra expressão (recursão à direita)
-# - Ou apenas um átomo
-?math    : atom OP math  
-         | atom
+# Uma expressão matemática é um átomo seguido de zero ou mais pares
+# operador/átomo, também de forma plana
+?math    : atom (OP atom)*
 
 # Um átomo pode ser:
 # - Um número (literal)
@@ -50,36 +47,44 @@ NUMBER   : DIGIT+
 """ 
 
 # Define um Transformer que percorre e transforma a árvore gerada pelo parser
-class ListTransformer(Transformer):
+class ListTransformer(Transformer_NonRecursive):
     def list(self, children):
-        # A regra 'list' retorna os filhos diretamente
-        # Se for lista com elementos, retorna o conteúdo da lista
-        return children[0]
+        # [] não tem filhos; [itens] tem um único filho, a lista de itens
+        return children[0] if children else []
 
     def math(self, children):
-        # A regra 'math' avalia expressões matemáticas simples usando eval
-        # Ex: [[1] + [2]] vira 1 + 2 = 3
-        x, op, y = children
-        return eval(f"{x} {op} {y}")
-
-    def single(self, children):
-        # Para listas com um único item, retorna o item diretamente
-        return children
+        # A regra 'math' avalia expressões matemáticas simples
+        # Ex: [[1] + [2]] vira [1] + [2] = [1, 2]
+        # Os filhos alternam operandos e operadores; cada operador é
+        # despachado pela tabela de operadores, da direita para a esquerda
+        return evaluate(children)
 
     def items(self, children):
-        # Trata a construção recursiva de listas com múltiplos itens
-        head, tail = children
-        if isinstance(children[1], list):
-            return [head, *tail]  # Junta cabeça e cauda se a cauda for lista
-        return children  # Caso contrário, retorna os itens como estão
+        # Os itens já chegam como uma lista plana
+        return children
 
     def NUMBER(self, token):
         # Converte tokens do tipo NUMBER (string) para inteiro
         return int(token)
 
+
+# Mesmas regras, mas as operações sobre listas numéricas são feitas elemento a
+# elemento com NumPy: [[1, 2] + [10, 20]] vira [[11, 22]]
+class VectorTransformer(ListTransformer):
+    def math(self, children):
+        return evaluate_array(children)
+
+
 # Instancia o transformer e o parser com a gramática fornecida
 transformer = ListTransformer()
-parser = Lark(grammar)
+vector_transformer = VectorTransformer()
+parser = make_parser(grammar)
+
+
+# Caminho rápido: mesmo resultado de transformer.transform(parser.parse(src))
+# (ou de vector_transformer, com vectorized), mas sem construir a árvore sintática
+def parse_fast(src, vectorized=False):
+    return parse_values(src, math=(vector_transformer if vectorized else transformer).math)
 
 # Função auxiliar que imprime a árvore sintática formatada ou o resultado final
 def pprint(obj):
@@ -98,3 +103,8 @@ if __name__ == "__main__":
 
     print("-" * 10)
     pprint(tree_)  # Imprime o resultado da transformação (ex: 3)
+
+    # Modo vetorizado: as operações agem elemento a elemento
+    src = "[[10, 20, 30] + [1, 2, 3] * 2]"
+    print("src:", src)
+    pprint(vector_transformer.transform(parser.parse(src)))  # Saída: [[12, 24, 36]]
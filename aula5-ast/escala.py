@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Mede como o tempo de parse + transformação das linguagens de listas cresce
+com o tamanho da entrada.
+
+Para listas planas com n elementos e para listas aninhadas com profundidade
+n, imprime o tempo total e o tempo por elemento. Se o custo é linear, o tempo
+por elemento fica aproximadamente constante; o script termina com erro se ele
+crescer mais que --tolerance vezes entre o menor e o maior tamanho.
+
+    python3 escala.py
+    python3 escala.py --module calc --max-size 1000000
+"""
+import importlib
+import sys
+import time
+
+import click  # type: ignore
+
+
+def flat(n: int) -> str:
+    return "[" + ",".join(str(i % 10) for i in range(n)) + "]"
+
+
+def nested(n: int) -> str:
+    return "[" * n + "1" + "]" * n
+
+
+SHAPES = {"plana": flat, "aninhada": nested}
+
+
+# Melhor tempo de parse + transformação entre algumas repetições
+def measure(module, src: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        module.transformer.transform(module.parser.parse(src))
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+@click.command()
+@click.option("--module", "modules", multiple=True, type=click.Choice(["listas", "calc", "listacalc"]),
+              help="Módulos medidos (padrão: todos).")
+@click.option("--min-size", default=10_000, show_default=True, help="Menor tamanho medido.")
+@click.option("--max-size", default=100_000, show_default=True, help="Maior tamanho medido (multiplica por 10).")
+@click.option("--repeat", default=3, help="Repetições de cada medida (vale a melhor).")
+@click.option("--tolerance", default=3.0, show_default=True,
+              help="Crescimento máximo aceito do tempo por elemento.")
+def main(modules, min_size, max_size, repeat, tolerance):
+    failures = []
+    print(f"{'módulo':<10} {'formato':<9} {'n':>9} {'total (s)':>10} {'por elemento (µs)':>18}")
+    for name in modules or ["listas", "calc", "listacalc"]:
+        module = importlib.import_module(name)
+        for shape, make in SHAPES.items():
+            per_item = []
+            n = min_size
+            while n <= max_size:
+                elapsed = measure(module, make(n), repeat)
+                per_item.append(elapsed / n)
+                print(f"{name:<10} {shape:<9} {n:>9} {elapsed:>10.3f} {elapsed / n * 1e6:>18.2f}")
+                n *= 10
+            if per_item[-1] > per_item[0] * tolerance:
+                failures.append(f"{name} {shape}: {per_item[0] * 1e6:.2f} -> {per_item[-1] * 1e6:.2f} µs/elemento")
+
+    for failure in failures:
+        print(f"crescimento não linear: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Acesso à fábrica de parsers da raiz do repositório (parser_factory.py) para
+os módulos desta aula, que a importam daqui:
+
+    from fabrica import make_parser
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parser_factory import make_parser  # noqa: E402
+
+__all__ = ["make_parser"]
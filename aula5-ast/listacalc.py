@@ -1,4 +1,7 @@
-from lark import Lark, Transformer, Tree # type: ignore
+from lark import Transformer_NonRecursive, Tree # type: ignore
+from fabrica import make_parser
+from rapido import parse_values  # Lê a lista direto para valores Python, sem árvore intermediária
+from operadores import evaluate, evaluate_array  # Tabela de operadores (sem eval) e modo vetorizado
 
 grammar = r"""
 ?start   : list 
@@ -6,14 +9,13 @@ grammar = r"""
 list     : "["  "]"
          | "[" items "]"
 
-items    : item            -> single
-         | item "," items
-         
+# Repetições planas: todos os itens (ou operandos) são filhos do mesmo nó,
+# em vez de uma cadeia com profundidade igual ao tamanho da lista
+items    : item ("," item)*
+
 ?item    : math
-         | list
-         
-?math    : atom OP math  
-         | atom
+
+?math    : atom (OP atom)*
          
 ?atom    : NUMBER
          | list
@@ -27,34 +29,42 @@ NUMBER   : DIGIT+
 """ 
 
 # Transformer que transforma a árvore sintática em estruturas Python reais
-class ListTransformer(Transformer):
+class ListTransformer(Transformer_NonRecursive):
     def list(self, children):
-        # Retorna o conteúdo da lista, que está dentro dos colchetes
-        return children[0]
+        # Retorna o conteúdo da lista, que está dentro dos colchetes ([] não tem filhos)
+        return children[0] if children else []
 
     def math(self, children):
-        # Avalia a expressão matemática com eval (ex: 1 + 2, 3 * 4, etc.)
-        x, op, y  = children
-        return eval(f"{x} {op} {y}")
-
-    def single(self, children):
-        # Para o caso de lista com apenas um item
-        return children
+        # Avalia a expressão matemática pela tabela de operadores (ex: 1 + 2,
+        # 3 * 4, etc.), da direita para a esquerda
+        return evaluate(children)
 
     def items(self, children):
-        # Junta o primeiro item (head) com o restante (tail)
-        head, tail = children
-        if isinstance(children[1], list):
-            return [head, *tail]
-        return children  # Fallback se não for uma lista (por segurança)
+        # Os itens já chegam como uma lista plana
+        return children
 
     def NUMBER(self, token):
         # Converte o número tokenizado para inteiro
         return int(token)
 
 
+
+# Mesmas regras, mas as operações sobre listas numéricas são feitas elemento a
+# elemento com NumPy: [[1, 2] + [10, 20]] vira [[11, 22]]
+class VectorTransformer(ListTransformer):
+    def math(self, children):
+        return evaluate_array(children)
+
+
 transformer = ListTransformer()
-parser = Lark(grammar)
+vector_transformer = VectorTransformer()
+parser = make_parser(grammar)
+
+
+# Caminho rápido: mesmo resultado de transformer.transform(parser.parse(src))
+# (ou de vector_transformer, com vectorized), mas sem construir a árvore sintática
+def parse_fast(src, vectorized=False):
+    return parse_values(src, math=(vector_transformer if vectorized else transformer).math)
 
 def pprint(obj):
     if hasattr(obj, "pretty"):
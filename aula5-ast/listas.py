@@ -1,4 +1,6 @@
-from lark import Lark, Transformer, Tree # type: ignore
+from lark import Transformer_NonRecursive, Tree # type: ignore
+from fabrica import make_parser
+from rapido import parse_values  # Lê a lista direto para valores Python, sem árvore intermediária
 
 grammar = r"""
 ?start   : list
@@ -6,9 +8,10 @@ grammar = r"""
 list     : "["  "]"
          | "[" items "]"
 
-?items   : item
-         | item "," items
-         
+# Repetição plana: todos os itens da lista são filhos do mesmo nó, em vez
+# de uma cadeia item "," items com profundidade igual ao tamanho da lista
+items    : item ("," item)*
+
 ?item    : NUMBER
          | list
 
@@ -17,19 +20,17 @@ NUMBER   : DIGIT+
 
 %ignore " " | "\n"
 """ 
-# Transformer que transforma a árvore sintática Lark em estruturas Python
-class ListTransformer(Transformer):
+# Transformer que transforma a árvore sintática Lark em estruturas Python.
+# A versão não recursiva percorre a árvore com uma pilha explícita, então
+# listas muito aninhadas não esbarram no limite de recursão do Python.
+class ListTransformer(Transformer_NonRecursive):
     def list(self, children):
-        # Retorna os filhos da lista diretamente (podem ser inteiros ou listas)
-        return children
+        # [] não tem filhos; [itens] tem um único filho, a lista de itens
+        return children[0] if children else []
 
     def items(self, children):
-        # Se a lista contiver múltiplos itens, junta a cabeça com a cauda
-        head, tail = children
-        
-        if isinstance(children[1], list):
-            return [head, *tail]  # Junta os itens da lista
-        return children  # Caso não seja uma lista (fallback)
+        # Os itens já chegam como uma lista plana
+        return children
 
     def NUMBER(self, token):
         # Converte o número lido (como string) para inteiro
@@ -37,7 +38,13 @@ class ListTransformer(Transformer):
 
 
 transformer = ListTransformer()
-parser = Lark(grammar)
+parser = make_parser(grammar)
+
+
+# Caminho rápido: mesmo resultado de transformer.transform(parser.parse(src)),
+# mas sem construir a árvore sintática
+def parse_fast(src):
+    return parse_values(src)
 
 def pprint(obj):
     if hasattr(obj, "pretty"):
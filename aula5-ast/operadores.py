@@ -0,0 +1,91 @@
+"""
+Avaliação das expressões de calc.py e listacalc.py sem eval.
+
+A regra math entrega os filhos alternando operandos e operadores, como
+[x, "+", y, "*", z], e a expressão é avaliada da direita para a esquerda
+(x + (y * z)). Cada operador é despachado por uma tabela de funções do
+módulo operator, então nenhuma string é compilada durante a avaliação.
+
+Há dois modos:
+
+- evaluate: a semântica de Python sobre os valores lidos (a mesma do antigo
+  eval): listas são concatenadas com + e repetidas com * inteiro;
+- evaluate_array: as listas numéricas viram arrays NumPy e os operadores
+  agem elemento a elemento, com broadcasting ([1, 2] + [10, 20] == [11, 22],
+  [1, 2] * 2 == [2, 4]). Os inteiros passam a ter 64 bits, como no NumPy.
+"""
+import operator
+from typing import Any, Callable
+
+# Operadores da gramática (terminal OP)
+OPS: dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "**": operator.pow,
+}
+
+
+def fold(children: list, convert: Callable[[Any], Any] = lambda x: x) -> Any:
+    """Avalia os filhos da regra math da direita para a esquerda."""
+    result = convert(children[-1])
+    for i in range(len(children) - 3, -1, -2):
+        result = OPS[children[i + 1]](convert(children[i]), result)
+    return result
+
+
+def evaluate(children: list) -> Any:
+    return fold(children)
+
+
+def evaluate_array(children: list) -> Any:
+    """
+    Avalia elemento a elemento com NumPy. Listas que não formam um array
+    numérico retangular geram TypeError. O resultado volta a ser uma lista
+    (ou um número, se nenhum operando era lista).
+    """
+    import numpy as np  # type: ignore
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, list):
+            return value
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            array = None  # Lista irregular
+        if array is None or array.dtype.kind not in "iuf":
+            raise TypeError(f"operações vetorizadas exigem listas numéricas retangulares: {value!r}")
+        return array
+
+    result = fold(children, convert)
+    return result.tolist() if isinstance(result, np.ndarray) else result
+
+
+if __name__ == "__main__":
+    import time
+
+    print(evaluate([[1, 2], "+", [3]]))             # Saída: [1, 2, 3]
+    print(evaluate_array([[1, 2], "*", 2, "+", 1]))  # Saída: [3, 6]
+    print(evaluate([2, "**", 3, "**", 2]))           # Saída: 512
+
+    # Expressão sobre vetores grandes: eval por operador (como antes), tabela
+    # de operadores e NumPy
+    n = 1_000_000
+    xs, ys = list(range(n)), list(range(n, 0, -1))
+
+    def with_eval(children):
+        result = children[-1]
+        for i in range(len(children) - 3, -1, -2):
+            result = eval(f"{children[i]} {children[i + 1]} {result!r}")
+        return result
+
+    for name, run in [
+        ("eval", lambda: with_eval([xs, "+", ys])),
+        ("tabela", lambda: evaluate([xs, "+", ys])),
+        ("tabela, elemento a elemento", lambda: [evaluate([x, "*", 2, "+", y]) for x, y in zip(xs, ys)]),
+        ("numpy, elemento a elemento", lambda: evaluate_array([xs, "*", 2, "+", ys])),
+    ]:
+        t0 = time.perf_counter()
+        run()
+        print(f"{name:<28} {time.perf_counter() - t0:.3f}s")
@@ -0,0 +1,104 @@
+"""
+Caminho rápido para as linguagens de listas da aula 5.
+
+O parser do Lark primeiro constrói a árvore sintática inteira (um Tree por
+regra e um Token por símbolo) e só depois o ListTransformer a percorre
+para produzir as listas Python. Aqui um tokenizador feito com uma única
+expressão regular alimenta um parser iterativo, com uma pilha explícita, que
+monta os valores diretamente, sem árvore intermediária e sem limite de
+profundidade.
+
+O resultado é o mesmo do parse + ListTransformer de listas.py (sem math) ou
+de calc.py / listacalc.py (passando o método math do transformer, que recebe
+os operandos e operadores alternados, como os filhos da regra math):
+
+    parse_values("[0,[42], 1,0]")                        # [0, [42], 1, 0]
+    parse_values("[[1] + [2, 3]]", math=transformer.math)  # [[1, 2, 3]]
+
+Entradas inválidas geram SyntaxError.
+"""
+import re
+from typing import Any, Callable
+
+# Um token por vez: número (1), operador (2) ou pontuação (3). Como na
+# gramática, só espaços e quebras de linha são ignorados.
+TOKEN = re.compile(r"[ \n]*(?:([0-9]+)|(\*\*|[-+*/])|([\[\],]))")
+BLANK = re.compile(r"[ \n]*")
+
+
+def parse_values(src: str, math: Callable[[list], Any] | None = None) -> Any:
+    """
+    Lê a lista em src. Sem math, operadores são um erro de sintaxe (como na
+    gramática de listas.py).
+    """
+    # Cada nível de aninhamento guarda os itens já lidos da lista e os
+    # operandos/operadores do item que está sendo lido
+    stack: list[tuple[list, list]] = []
+    items: list = []
+    expr: list = []
+    expect_value = True  # Próximo token deve ser um operando
+    just_opened = False  # Último token foi "[" (para aceitar [])
+    result: Any = None
+    done = False
+    pos = 0
+    end = len(src)
+
+    while True:
+        m = TOKEN.match(src, pos)
+        if m is None:
+            pos = BLANK.match(src, pos).end()  # type: ignore
+            if pos == end:
+                break
+            raise SyntaxError(f"caractere inesperado {src[pos]!r} na posição {pos}")
+        number, op, punct = m.groups()
+        start = m.start(m.lastindex)  # type: ignore
+        pos = m.end()
+        if done:
+            raise SyntaxError(f"conteúdo após o fim da lista na posição {start}")
+
+        if punct == "[":
+            if not expect_value:
+                raise SyntaxError(f"'[' inesperado na posição {start}")
+            stack.append((items, expr))
+            items, expr = [], []
+            just_opened = True
+            continue
+
+        if number is not None:
+            if not expect_value or not stack:
+                raise SyntaxError(f"número inesperado na posição {start}")
+            expr.append(int(number))
+            expect_value = False
+        elif op is not None:
+            if math is None or expect_value:
+                raise SyntaxError(f"operador {op!r} inesperado na posição {start}")
+            expr.append(op)
+            expect_value = True
+        elif punct == ",":
+            if expect_value:
+                raise SyntaxError(f"',' inesperada na posição {start}")
+            items.append(expr[0] if len(expr) == 1 else math(expr))  # type: ignore
+            expr = []
+            expect_value = True
+        else:  # "]"
+            if expect_value and not just_opened:
+                raise SyntaxError(f"']' inesperado na posição {start}")
+            if expr:
+                items.append(expr[0] if len(expr) == 1 else math(expr))  # type: ignore
+            value = items
+            items, expr = stack.pop()
+            if stack:
+                expr.append(value)
+            else:
+                result, done = value, True
+            expect_value = False
+        just_opened = False
+
+    if not done:
+        raise SyntaxError("fim inesperado da entrada")
+    return result
+
+
+if __name__ == "__main__":
+    print(parse_values("[0,[42], 1,0]"))  # Saída: [0, [42], 1, 0]
+    print(parse_values("[[], [[3]]]"))    # Saída: [[], [[3]]]
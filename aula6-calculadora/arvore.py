@@ -0,0 +1,191 @@
+"""
+Árvore sintática abstrata (AST) da calculadora.
+
+O CalcTransformer de calc.py avalia o programa enquanto percorre a árvore do
+Lark. Aqui o programa vira uma estrutura própria, independente da forma de
+avaliar: o compilador (compilador.py), a avaliação vetorizada e as
+otimizações trabalham todos sobre estes nós.
+
+    program = to_ast("x = 2; y = x + 1; x * y")
+    # Program(decls=(Decl('x', Num(2)), Decl('y', BinOp('add', Var('x'), Num(1)))),
+    #         result=BinOp('mul', Var('x'), Var('y')))
+
+Os nós são imutáveis e comparáveis por valor, então subárvores iguais são
+iguais (e têm o mesmo hash).
+"""
+import math
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Union
+
+from lark import Transformer, v_args  # type: ignore
+
+from calc import parser
+
+Expr = Union["Num", "Var", "BinOp"]
+
+# Operadores da gramática: nome da regra -> (operador Python, função)
+OPS: dict[str, tuple[str, Callable[[Any, Any], Any]]] = {
+    "add": ("+", operator.add),
+    "sub": ("-", operator.sub),
+    "mul": ("*", operator.mul),
+    "div": ("/", operator.truediv),
+    "pow": ("**", operator.pow),
+    "gt": (">", operator.gt),
+    "lt": ("<", operator.lt),
+    "ge": (">=", operator.ge),
+    "le": ("<=", operator.le),
+    "eq": ("==", operator.eq),
+    "ne": ("!=", operator.ne),
+}
+
+
+@dataclass(frozen=True)
+class Num:
+    value: Any
+
+
+@dataclass(frozen=True)
+class Var:
+    name: str
+
+
+@dataclass(frozen=True)
+class BinOp:
+    op: str  # Chave de OPS
+    left: Expr
+    right: Expr
+
+
+@dataclass(frozen=True)
+class Decl:
+    name: str
+    value: Expr
+
+
+@dataclass(frozen=True)
+class Program:
+    """Declarações executadas em ordem, seguidas da expressão final."""
+
+    decls: tuple[Decl, ...]
+    result: Expr
+
+
+# Gera o método que constrói o nó de um operador
+def binop(name):
+    def method(self, left, right):
+        return BinOp(name, left, right)
+    return method
+
+
+@v_args(inline=True)
+class AstTransformer(Transformer):
+    # Operadores aritméticos
+    add = binop("add")
+    sub = binop("sub")
+    mul = binop("mul")
+    div = binop("div")
+    pow = binop("pow")
+
+    # Comparações
+    gt = binop("gt")
+    lt = binop("lt")
+    ge = binop("ge")
+    le = binop("le")
+    eq = binop("eq")
+    ne = binop("ne")
+
+    def decl(self, name, value):
+        return Decl(name, value)
+
+    def body(self, decls, decl):
+        # body é recursivo à esquerda: acumula as declarações em uma lista
+        if isinstance(decls, Decl):
+            decls = [decls]
+        decls.append(decl)
+        return decls
+
+    def prog(self, decls, result):
+        return Program(tuple([decls] if isinstance(decls, Decl) else decls), result)
+
+    def NUMBER(self, token):
+        return Num(int(token))
+
+    def DEF(self, token):
+        return str(token)
+
+    def VAR(self, token):
+        return Var(str(token))
+
+
+transformer = AstTransformer()
+
+
+def to_ast(src: str) -> Program:
+    """Programa da calculadora como AST (sempre um Program)."""
+    result = transformer.transform(parser.parse(src))
+    return result if isinstance(result, Program) else Program((), result)
+
+
+def walk(expr: Expr) -> Iterator[Expr]:
+    """Todos os nós da expressão, em pré-ordem."""
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, BinOp):
+            stack.append(node.right)
+            stack.append(node.left)
+
+
+def free_vars(program: Program) -> list[str]:
+    """Variáveis lidas antes de serem declaradas (vêm do ambiente), em ordem."""
+    defined: set[str] = set()
+    free: list[str] = []
+    exprs = [(decl.value, decl.name) for decl in program.decls] + [(program.result, None)]
+    for expr, name in exprs:
+        for node in walk(expr):
+            if isinstance(node, Var) and node.name not in defined and node.name not in free:
+                free.append(node.name)
+        if name is not None:
+            defined.add(name)
+    return free
+
+
+# Altura máxima (em operações) das expressões geradas por to_source com spill.
+# O parser do Python recusa expressões aninhadas demais: mais de 200
+# parênteses, ou cadeias de ** com algumas centenas de níveis.
+MAX_HEIGHT = 32
+
+
+def to_source(expr: Expr, spill: Callable[[str], str] | None = None) -> str:
+    """
+    Expressão Python equivalente (totalmente parentizada). Com spill, cada
+    subexpressão que chega a MAX_HEIGHT níveis de operações vira
+    spill(código), que deve guardar o valor em uma variável e devolver o
+    nome dela.
+    """
+    return source_height(expr, spill)[0]
+
+
+# Código da expressão e a sua altura em operações
+def source_height(expr: Expr, spill: Callable[[str], str] | None) -> tuple[str, int]:
+    if isinstance(expr, Num):
+        # Constantes calculadas pelo otimizador podem ser negativas ou infinitas
+        text = repr(expr.value)
+        if isinstance(expr.value, float) and not math.isfinite(expr.value):
+            text = f"float({text!r})"
+        return (f"({text})" if text.startswith("-") else text), 0
+    if isinstance(expr, Var):
+        return expr.name, 0
+    left, left_height = source_height(expr.left, spill)
+    right, right_height = source_height(expr.right, spill)
+    text, height = f"({left} {OPS[expr.op][0]} {right})", max(left_height, right_height) + 1
+    if spill is not None and height >= MAX_HEIGHT:
+        return spill(text), 0
+    return text, height
+
+
+if __name__ == "__main__":
+    print(to_ast("x = 2; y = x + 1; x * y"))
+    print(to_source(to_ast("(x > 1) + 2 ^ 3 ^ 2").result))  # Saída: ((x > 1) + (2 ** (3 ** 2)))
@@ -1,5 +1,10 @@
-from lark import Lark, Transformer, Tree, v_args # type: ignore
+from lark import Transformer, Tree, v_args # type: ignore
 from rich import print  # type: ignore # comente isso se quebrar, ou pip install rich
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from parser_factory import make_parser
 
 grammar = r"""
 ?start   : prog  # Ponto de entrada da gramática
@@ -96,7 +101,7 @@ class CalcTransformer(Transformer):
 
     
 transformer = CalcTransformer()
-parser = Lark(grammar)
+parser = make_parser(grammar)
 
 def pprint(obj):
     if hasattr(obj, "pretty"):
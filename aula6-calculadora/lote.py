@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+"""
+Avaliação vetorizada de uma fórmula da calculadora sobre colunas de x, y e z.
+
+Em vez de um laço em Python que avalia o programa uma vez por linha, as
+variáveis recebem arrays NumPy inteiros e a função gerada pelo compilador
+(compilador.py) é executada uma vez só: cada operador (+, -, *, /, ^ ou 🫠 e
+as comparações) vira uma única operação vetorizada sobre as colunas, e as
+declarações intermediárias ficam guardadas como arrays.
+
+    evaluate_batch("y = x + 1; x * y > z", {"x": xs, "y": ys, "z": zs})
+
+Arquivos CSV (com cabeçalho nomeando as colunas) são lidos em blocos de
+linhas, então o arquivo não precisa caber na memória:
+
+    python3 lote.py csv "x * y + z" dados.csv --output resultado.txt
+
+Sem argumentos, python3 lote.py roda os exemplos do módulo.
+
+Diferenças em relação à avaliação escalar: os números seguem os tipos do
+NumPy (inteiros de 64 bits, potências de inteiros com expoente negativo não
+são aceitas) e divisões por zero produzem inf ou nan em vez de
+ZeroDivisionError. Comparações usadas em contas ou guardadas em declarações
+valem 0 ou 1, como True e False na avaliação escalar (veja int_comparisons).
+"""
+import sys
+import time
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterator, Mapping
+
+import click  # type: ignore
+import numpy as np  # type: ignore
+
+import otimizador
+from arvore import BinOp, Decl, Num, Program, free_vars, to_ast
+from compilador import Compiled, compile_ast, compile_program
+
+CHUNK_ROWS = 1_000_000  # Linhas do CSV avaliadas por vez
+
+ARITHMETIC = {"add", "sub", "mul", "div", "pow"}
+
+
+# Comparações sobre arrays produzem arrays de bool, que o NumPy não trata
+# como inteiros: bool - bool gera TypeError e bool + bool é um "ou". Por isso
+# as comparações usadas em contas ou guardadas em declarações são somadas a
+# 0, o que as converte para inteiros; as outras continuam bool.
+def int_comparisons(program: Program) -> Program:
+    def convert(expr, as_int):
+        if not isinstance(expr, BinOp):
+            return expr
+        arithmetic = expr.op in ARITHMETIC
+        expr = BinOp(expr.op, convert(expr.left, arithmetic), convert(expr.right, arithmetic))
+        return BinOp("add", expr, Num(0)) if as_int and not arithmetic else expr
+
+    decls = tuple(Decl(decl.name, convert(decl.value, True)) for decl in program.decls)
+    return Program(decls, convert(program.result, False))
+
+
+@lru_cache(maxsize=1024)
+def compile_batch(src: str, optimize: bool = False) -> Compiled:
+    """Como compilador.compile_program, mas com as comparações de int_comparisons."""
+    program = to_ast(src)
+    if optimize:
+        program, _ = otimizador.optimize(program)
+    return compile_ast(int_comparisons(program))
+
+
+def evaluate_batch(
+    src: str, columns: Mapping[str, Any], optimize: bool = False, rows: int | None = None
+) -> np.ndarray:
+    """
+    Avalia o programa para cada linha das colunas (arrays do mesmo tamanho,
+    indexados pelo nome da variável). Retorna um array com um resultado por
+    linha. rows é o número de linhas, necessário quando o programa não lê
+    nenhuma coluna (sem colunas e sem rows, o resultado tem uma linha). Com
+    optimize, usa o programa otimizado (veja otimizador.py).
+    """
+    env = {name: np.asarray(values) for name, values in columns.items()}
+    sizes = {len(values) for values in env.values()}
+    if rows is not None:
+        sizes.add(rows)
+    if len(sizes) > 1:
+        raise ValueError(f"colunas com tamanhos diferentes: {sorted(sizes)}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = compile_batch(src, optimize)(env)
+    # Programas que não leem nenhuma coluna produzem um único valor
+    return np.broadcast_to(result, (sizes.pop() if sizes else 1,))
+
+
+def read_csv_chunks(
+    path: str, names: list[str], chunk_rows: int = CHUNK_ROWS
+) -> Iterator[tuple[int, dict[str, np.ndarray]]]:
+    """
+    Produz as colunas pedidas do CSV, chunk_rows linhas por vez, junto com o
+    número de linhas do bloco (que vale mesmo quando nenhuma coluna é pedida).
+    """
+    with open(path) as fd:
+        header = [name.strip() for name in fd.readline().split(",")]
+        missing = [name for name in names if name not in header]
+        if missing:
+            raise KeyError(f"colunas ausentes no CSV: {', '.join(missing)}")
+        usecols = [header.index(name) for name in names]
+        while lines := list(islice(fd, chunk_rows)):
+            data = np.loadtxt(lines, delimiter=",", usecols=usecols, ndmin=2)
+            yield len(lines), {name: data[:, i] for i, name in enumerate(names)}
+
+
+def evaluate_csv(src: str, path: str, chunk_rows: int = CHUNK_ROWS, optimize: bool = False) -> Iterator[np.ndarray]:
+    """Resultados do programa para as linhas do CSV, um array por bloco."""
+    program = to_ast(src)
+    if optimize:
+        # Declarações mortas podem ler colunas que não são mais necessárias
+        program, _ = otimizador.optimize(program)
+    for rows, columns in read_csv_chunks(path, free_vars(program), chunk_rows):
+        yield evaluate_batch(src, columns, optimize, rows)
+
+
+@click.group()
+def main():
+    pass
+
+
+@main.command()
+@click.argument("src")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--chunk-rows", default=CHUNK_ROWS, show_default=True, help="Linhas lidas e avaliadas por vez.")
+@click.option("--output", type=click.File("w"), help="Grava um resultado por linha neste arquivo.")
+@click.option("--optimize", is_flag=True, help="Otimiza o programa antes de avaliar.")
+def csv(src, path, chunk_rows, output, optimize):
+    """Avalia a fórmula SRC para cada linha do CSV em PATH."""
+    t0 = time.perf_counter()
+    rows = 0
+    for result in evaluate_csv(src, path, chunk_rows, optimize):
+        rows += len(result)
+        if output:
+            np.savetxt(output, result, fmt="%s")
+    elapsed = time.perf_counter() - t0
+    print(f"{rows} linhas em {elapsed:.2f}s", file=sys.stderr)
+
+
+@main.command()
+@click.option("--rows", default=1_000_000, show_default=True, help="Linhas avaliadas.")
+def bench(rows):
+    """Compara a avaliação linha a linha com a vetorizada."""
+    from calc import parser, transformer
+
+    src = "x = x * y; y = x + z ^ 2; y / (x + 1) > x - z"
+    rng = np.random.default_rng(0)
+    columns = {name: rng.uniform(-10, 10, rows) for name in "xyz"}
+    t0 = time.perf_counter()
+    result = evaluate_batch(src, columns)
+    vectorized = time.perf_counter() - t0
+
+    run = compile_program(src)
+    xs, ys, zs = (columns[name].tolist() for name in "xyz")
+    t0 = time.perf_counter()
+    expected = [run({"x": x, "y": y, "z": z}) for x, y, z in zip(xs, ys, zs)]
+    compiled = time.perf_counter() - t0
+    assert result.tolist() == expected
+
+    # O CalcTransformer refaz a análise a cada linha: mede só algumas
+    sample = min(rows, 200)
+    t0 = time.perf_counter()
+    for x, y, z in zip(xs[:sample], ys[:sample], zs[:sample]):
+        transformer.env = {"x": x, "y": y, "z": z}
+        transformer.transform(parser.parse(src))
+    per_row = (time.perf_counter() - t0) / sample
+
+    print(f"transformer por linha: {per_row * rows:.2f}s (estimado a partir de {sample} linhas)")
+    print(f"compilado por linha:   {compiled:.2f}s")
+    print(f"vetorizado:            {vectorized:.3f}s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main()
+        sys.exit()
+
+    # Sem argumentos: exemplos
+    import tempfile
+
+    xs, ys = np.array([1, 2, 3]), np.array([2, 2, 1])
+    print(evaluate_batch("(x > y) - (y > x)", {"x": xs, "y": ys}))  # Saída: [-1  0  1]
+
+    # Otimizado, este programa não lê nenhuma coluna (a única leitura, de y,
+    # está numa declaração morta), mas ainda produz um resultado por linha
+    with tempfile.NamedTemporaryFile("w", suffix=".csv") as fd:
+        fd.write("x,y\n" + "".join(f"{i},{i}\n" for i in range(10)))
+        fd.flush()
+        for optimize in (False, True):
+            results = evaluate_csv("x = y; x = 3; x + 1", fd.name, chunk_rows=4, optimize=optimize)
+            assert np.concatenate(list(results)).tolist() == [4] * 10
+    print("linhas: ok")
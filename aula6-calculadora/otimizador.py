@@ -0,0 +1,207 @@
+#!/usr/bin/python3
+"""
+Otimizações sobre a AST da calculadora (arvore.py).
+
+optimize(program) devolve um Program equivalente, que qualquer forma de
+avaliação (compilador.py, lote.py) pode usar no lugar do original, e um
+relatório do que foi removido. O programa é reconstruído como um grafo em
+que cada subexpressão existe uma única vez (hash-consing):
+
+- as declarações são substituídas nos pontos onde são lidas, então a
+  expressão final passa a depender só de constantes e das variáveis do
+  ambiente, e declarações que ela nunca lê desaparecem;
+- operações com os dois operandos constantes são calculadas na hora
+  (dobramento de constantes), exceto divisões por zero e operações cujo
+  resultado seria um inteiro grande demais, que ficam para a execução;
+- subexpressões iguais viram o mesmo nó; as usadas mais de uma vez são
+  calculadas uma vez só, em declarações temporárias (_1, _2, ...).
+
+    >>> program, report = optimize(to_ast("x = 2; y = x + 1; x * y"))
+    >>> program.result
+    Num(value=6)
+
+Como declarações mortas não são avaliadas, os erros que elas gerariam
+(como uma divisão por zero) também não acontecem.
+"""
+from dataclasses import dataclass
+from typing import Any
+
+import click  # type: ignore
+
+from arvore import OPS, BinOp, Decl, Expr, Num, Program, Var, to_ast, walk
+
+# Operações inteiras só são dobradas se o resultado tiver até este número de
+# bits (2 ^ 4096 tem mais de 1200 dígitos). Constantes maiores ficariam caras
+# de calcular e de escrever no código gerado, onde o repr de inteiros acima
+# de 4300 dígitos nem é permitido.
+MAX_INT_BITS = 4096
+
+NOT_FOLDED = object()
+
+
+# Os nós contados são as operações (BinOp), que são o que custa avaliar:
+# números e variáveis são folhas, e cada temporária lida conta zero
+@dataclass
+class Report:
+    nodes_before: int
+    nodes_after: int
+    folded: int = 0  # Operações calculadas durante a otimização
+    merged: int = 0  # Subexpressões repetidas que viraram um nó só
+    dead_decls: int = 0  # Declarações que a expressão final nunca lê
+
+    @property
+    def removed(self) -> int:
+        return self.nodes_before - self.nodes_after
+
+    def __str__(self):
+        return (
+            f"{self.nodes_before} -> {self.nodes_after} nós ({self.removed} removidos): "
+            f"{self.folded} operações dobradas, {self.merged} subexpressões repetidas, "
+            f"{self.dead_decls} declarações mortas"
+        )
+
+
+def count_nodes(program: Program) -> int:
+    exprs = [decl.value for decl in program.decls] + [program.result]
+    return sum(isinstance(node, BinOp) for expr in exprs for node in walk(expr))
+
+
+def fold(op: str, left: Any, right: Any) -> Any:
+    """Valor da operação com operandos constantes, ou NOT_FOLDED."""
+    if op == "pow" and isinstance(left, int) and isinstance(right, int):
+        # Verificado antes de calcular, pois a própria potência já seria cara
+        if abs(left) > 1 and right * abs(left).bit_length() > MAX_INT_BITS:
+            return NOT_FOLDED
+    try:
+        value = OPS[op][1](left, right)
+    except (ArithmeticError, TypeError, ValueError):
+        return NOT_FOLDED  # O erro fica para a execução
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        return NOT_FOLDED
+    return value
+
+
+class Builder:
+    """Constrói nós únicos: subexpressões iguais são o mesmo objeto."""
+
+    def __init__(self):
+        self.table: dict[tuple, Expr] = {}
+        self.folded = 0
+        self.merged = 0
+
+    def intern(self, key: tuple, make) -> Expr:
+        node = self.table.get(key)
+        if node is None:
+            node = self.table[key] = make()
+        elif key[0] == "op":
+            self.merged += 1
+        return node
+
+    def num(self, value: Any) -> Expr:
+        # O tipo entra na chave para não misturar 1, 1.0 e True
+        return self.intern(("num", type(value), value), lambda: Num(value))
+
+    def var(self, name: str) -> Expr:
+        return self.intern(("var", name), lambda: Var(name))
+
+    def binop(self, op: str, left: Expr, right: Expr) -> Expr:
+        if isinstance(left, Num) and isinstance(right, Num):
+            value = fold(op, left.value, right.value)
+            if value is not NOT_FOLDED:
+                self.folded += 1
+                return self.num(value)
+        # Os filhos já são únicos, então a identidade deles basta como chave
+        return self.intern(("op", op, id(left), id(right)), lambda: BinOp(op, left, right))
+
+
+def optimize(program: Program) -> tuple[Program, Report]:
+    builder = Builder()
+    env: dict[str, tuple[Expr, int]] = {}  # Nome -> (valor, índice da declaração)
+    reads: list[set[int]] = []  # Declarações lidas por cada declaração
+
+    def rebuild(expr: Expr, used: set[int]) -> Expr:
+        if isinstance(expr, Num):
+            return builder.num(expr.value)
+        if isinstance(expr, Var):
+            if expr.name in env:
+                value, index = env[expr.name]
+                used.add(index)
+                return value
+            return builder.var(expr.name)
+        return builder.binop(expr.op, rebuild(expr.left, used), rebuild(expr.right, used))
+
+    for i, decl in enumerate(program.decls):
+        used: set[int] = set()
+        env[decl.name] = (rebuild(decl.value, used), i)
+        reads.append(used)
+    used = set()
+    result = rebuild(program.result, used)
+
+    # Declarações alcançáveis a partir da expressão final
+    live: set[int] = set()
+    pending = list(used)
+    while pending:
+        index = pending.pop()
+        if index not in live:
+            live.add(index)
+            pending.extend(reads[index])
+
+    optimized = emit(result)
+    report = Report(
+        count_nodes(program),
+        count_nodes(optimized),
+        folded=builder.folded,
+        merged=builder.merged,
+        dead_decls=len(program.decls) - len(live),
+    )
+    return optimized, report
+
+
+def emit(result: Expr) -> Program:
+    """
+    Transforma o grafo de nós únicos de volta em um Program: cada operação
+    com mais de um uso vira uma declaração temporária, calculada antes de
+    todos os seus usos.
+    """
+    uses: dict[int, int] = {}
+    stack = [result]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinOp):
+            for child in (node.left, node.right):
+                uses[id(child)] = uses.get(id(child), 0) + 1
+                if uses[id(child)] == 1:
+                    stack.append(child)
+
+    decls: list[Decl] = []
+    temps: dict[int, Var] = {}
+
+    def build(node: Expr) -> Expr:
+        if not isinstance(node, BinOp):
+            return node
+        if id(node) in temps:
+            return temps[id(node)]
+        expr = BinOp(node.op, build(node.left), build(node.right))
+        if uses.get(id(node), 0) > 1:
+            temps[id(node)] = Var(f"_{len(temps) + 1}")
+            decls.append(Decl(temps[id(node)].name, expr))
+            return temps[id(node)]
+        return expr
+
+    expr = build(result)  # Preenche decls
+    return Program(tuple(decls), expr)
+
+
+@click.command()
+@click.argument("src")
+def main(src):
+    """Mostra o programa SRC otimizado e o relatório."""
+    from compilador import program_source
+
+    program, report = optimize(to_ast(src))
+    print(program_source(program))
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
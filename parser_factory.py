@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+"""
+Fábrica de parsers Lark compartilhada pelas aulas.
+
+make_parser(grammar) constrói o parser com o algoritmo mais rápido que a
+gramática aceita: tenta LALR(1) e, se a gramática tiver conflitos
+shift/reduce ou reduce/reduce (ou terminais idênticos, que só o lexer
+dinâmico do Earley consegue separar pelo contexto), usa Earley, que aceita
+exatamente a linguagem descrita. As tabelas LALR analisadas ficam em cache no disco,
+em um arquivo indexado pelo hash da gramática e das opções, então só a
+primeira execução paga a análise da gramática; dentro de um mesmo processo,
+o parser construído é reaproveitado.
+
+Os módulos das aulas importam a fábrica adicionando a raiz do repositório ao
+sys.path:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from parser_factory import make_parser
+
+    parser = make_parser(grammar)
+
+Pela linha de comando, gera um módulo standalone (que não depende do Lark) ou
+mede o tempo de inicialização de cada gramática do repositório:
+
+    python3 parser_factory.py standalone aula10-lox/grammar.lark lox_parser.py
+    python3 parser_factory.py bench
+"""
+import ast
+import hashlib
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import click  # type: ignore
+import lark  # type: ignore
+from lark import Lark  # type: ignore
+from lark.exceptions import GrammarError  # type: ignore
+from lark.utils import logger as lark_logger  # type: ignore
+
+ROOT = Path(__file__).resolve().parent
+
+# Opções que não entram no hash do cache (objetos, não configuração)
+UNHASHABLE = ("transformer", "postlex", "lexer_callbacks", "edit_terminals")
+
+# Parsers já construídos neste processo
+_parsers: dict[tuple, Lark] = {}
+
+
+# Diretório padrão onde ficam as tabelas LALR já analisadas
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "lark-parsers"
+
+
+def cache_key(grammar: str, options: dict[str, Any]) -> str:
+    config = "".join(f"\0{k}={options[k]!r}" for k in sorted(options) if k not in UNHASHABLE)
+    return hashlib.sha256(f"{lark.__version__}\0{grammar}{config}".encode()).hexdigest()
+
+
+# O Lark resolve conflitos shift/reduce do LALR sempre com shift e só avisa no
+# log, o que pode mudar a linguagem aceita (ex.: vírgula final opcional em
+# uma lista). Este handler captura esses avisos durante a construção.
+class ConflictLog(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.conflicts: list[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if "conflict" in message:
+            self.conflicts.append(message)
+
+
+def build_lalr(grammar: str, cache: str | bool, **options) -> tuple[Lark, list[str]]:
+    handler = ConflictLog()
+    handlers, level = lark_logger.handlers, lark_logger.level
+    lark_logger.handlers = [handler]
+    lark_logger.setLevel(logging.DEBUG)
+    try:
+        return Lark(grammar, parser="lalr", cache=cache, **options), handler.conflicts
+    finally:
+        lark_logger.handlers = handlers
+        lark_logger.setLevel(level)
+
+
+# Terminais com exatamente o mesmo padrão (como VAR e DEF definidos ambos
+# como "x" | "y" | "z") não causam erro no LALR, mas o lexer contextual só
+# olha um token à frente e escolhe errado
+def has_terminal_collision(parser: Lark) -> bool:
+    patterns = [(t.pattern.type, t.pattern.value, tuple(t.pattern.flags)) for t in parser.terminals]
+    return len(set(patterns)) < len(patterns)
+
+
+def build_parser(grammar: str, *, parser: str = "auto", cache_dir: Path | None = None, **options) -> Lark:
+    """
+    Constrói o parser sem consultar os parsers já construídos no processo
+    (mas usando o cache em disco). parser pode ser "auto", "lalr" ou "earley".
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    key = cache_key(grammar, options)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache: str | bool = str(cache_dir / f"{key}.lalr")
+    except OSError:
+        cache = False  # Sem cache se o diretório não puder ser criado
+    # Marca gramáticas que já se sabe que não são LALR, para não repetir a
+    # tentativa (que é a parte cara) a cada execução
+    earley_marker = cache_dir / f"{key}.earley"
+
+    if parser == "lalr":
+        return Lark(grammar, parser="lalr", cache=cache, **options)
+    if parser == "auto" and not earley_marker.exists():
+        try:
+            result, conflicts = build_lalr(grammar, cache, **options)
+        except GrammarError:
+            pass  # Conflitos reduce/reduce
+        else:
+            if not conflicts and not has_terminal_collision(result):
+                return result
+        if cache:
+            earley_marker.touch()
+            Path(cache).unlink(missing_ok=True)  # type: ignore
+    return Lark(grammar, parser="earley", **options)
+
+
+def make_parser(grammar: str, *, parser: str = "auto", cache_dir: Path | None = None, **options) -> Lark:
+    """Parser para a gramática, reaproveitado se já foi construído neste processo."""
+    key = (grammar, parser, str(cache_dir), *sorted((k, v if k not in UNHASHABLE else id(v)) for k, v in options.items()))
+    if key not in _parsers:
+        _parsers[key] = build_parser(grammar, parser=parser, cache_dir=cache_dir, **options)
+    return _parsers[key]
+
+
+def emit_standalone(grammar: str, path: str | Path, **options):
+    """
+    Grava um módulo Python com o parser LALR da gramática que não depende do
+    Lark instalado. Gramáticas com conflitos LALR geram GrammarError.
+    """
+    from lark.tools.standalone import gen_standalone  # type: ignore
+
+    parser, conflicts = build_lalr(grammar, False, **options)
+    if conflicts:
+        raise GrammarError("a gramática não é LALR(1):\n" + "\n".join(conflicts))
+    with open(path, "w") as out:
+        gen_standalone(parser, out=out)
+
+
+# Lê a gramática de um arquivo .lark ou da variável grammar de um módulo .py,
+# sem importar o módulo (a importação já construiria o parser)
+def load_grammar(path: str | Path) -> str:
+    path = Path(path)
+    if path.suffix != ".py":
+        return path.read_text()
+    for node in ast.parse(path.read_text()).body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "grammar" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"{path} não define a variável grammar")
+
+
+# Gramáticas do repositório e uma entrada de exemplo para cada uma
+BENCH_TARGETS = {
+    "aula4-lark/listas.py": "[x,[x,]]",
+    "aula5-ast/listas.py": "[0,[42], 1,0]",
+    "aula5-ast/calc.py": "[[1] + [2, 3]]",
+    "aula5-ast/listacalc.py": "[[1] + [2, 3]]",
+    "aula6-calculadora/calc.py": "x = 2; y = x + 1; x * y",
+    "aula10-lox/grammar.lark": "(1 + 2) * x != nil",
+}
+
+
+# Tempo de importação do módulo em um processo novo
+def time_import(path: Path) -> float:
+    code = (
+        "import sys, time, io, contextlib; sys.path.insert(0, '.'); t = time.perf_counter()\n"
+        f"with contextlib.redirect_stdout(io.StringIO()): import {path.stem}\n"
+        "print(time.perf_counter() - t)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=path.parent, capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-1])
+
+
+@click.group()
+def main():
+    pass
+
+
+@main.command()
+@click.argument("grammar_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output", type=click.Path(dir_okay=False))
+def standalone(grammar_path, output):
+    """Gera um parser standalone para a gramática (.lark ou módulo .py)."""
+    emit_standalone(load_grammar(grammar_path), output)
+    print(f"parser gravado em {output}")
+
+
+@main.command()
+@click.option("--repeat", default=5, help="Repetições de cada medida (vale a melhor).")
+def bench(repeat):
+    """Mede construção + primeira análise com Earley, sem cache e com cache."""
+    print(f"{'gramática':<28} {'algoritmo':<9} {'Earley (ms)':>12} {'1a vez (ms)':>12} {'cache (ms)':>11} {'import (ms)':>12}")
+    for target, sample in BENCH_TARGETS.items():
+        grammar = load_grammar(ROOT / target)
+
+        def best(build) -> float:
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                build().parse(sample)
+                times.append(time.perf_counter() - t0)
+            return min(times) * 1000
+
+        earley = best(lambda: Lark(grammar))
+        with tempfile.TemporaryDirectory() as tmp:
+            # Cada repetição começa com o cache vazio
+            def cold() -> Lark:
+                for f in Path(tmp).iterdir():
+                    f.unlink()
+                return build_parser(grammar, cache_dir=Path(tmp))
+
+            first = best(cold)
+            cached = best(lambda: build_parser(grammar, cache_dir=Path(tmp)))
+            algorithm = build_parser(grammar, cache_dir=Path(tmp)).options.parser
+
+        # A gramática do Lox fica em um arquivo separado do módulo
+        module = ROOT / target if target.endswith(".py") else (ROOT / target).with_name("lox.py")
+        build_parser(grammar)  # Preenche o cache padrão usado pelo módulo
+        imported = min(time_import(module) for _ in range(repeat)) * 1000
+        print(f"{target:<28} {algorithm:<9} {earley:>12.1f} {first:>12.1f} {cached:>11.1f} {imported:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()